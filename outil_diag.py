@@ -0,0 +1,4084 @@
+# -*- coding: utf-8 -*-
+"""
+System Diagnostics Tool - Compatible Windows/Linux
+Auteur: CEZAR277
+
+Code de l'outil, importé par le lanceur tool.py: en module, il profite du cache de bytecode (.pyc)
+au lieu d'être recompilé à chaque lancement.
+"""
+
+import argparse
+import contextlib
+import functools
+import platform
+import socket
+import psutil
+import os
+import sys
+import heapq
+import itertools
+import math
+import re
+import threading
+import time
+from array import array
+from collections import deque, namedtuple
+from datetime import datetime
+from enum import Enum
+
+class Colors:
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+
+class Status(Enum):
+    """État d'une vérification, du meilleur au pire"""
+    OK = 'ok'
+    WARNING = 'warning'
+    CRITICAL = 'critical'
+    UNKNOWN = 'unknown'
+
+STATUS_SCORE = {Status.OK: 100, Status.WARNING: 50, Status.CRITICAL: 0}
+STATUS_COLOR = {Status.OK: Colors.GREEN, Status.WARNING: Colors.WARNING, Status.CRITICAL: Colors.FAIL, Status.UNKNOWN: Colors.WARNING}
+
+# Seuils (avertissement, critique) utilisés par les vérifications
+THRESHOLDS = {
+    'cpu_usage_percent': (80, 95),
+    'cpu_temperature_c': (85, 95),
+    'memory_usage_percent': (85, 95),
+    'disk_usage_percent': (90, 97),
+    'battery_percent': (20, 10),
+    'cpu_single_core_score': (700, 400),
+    'cpu_all_core_score': (2800, 1200),
+    'disk_write_mb_per_s': (50, 20),
+    'disk_rand_read_iops': (5000, 500),
+    'network_latency_ms': (50, 100),
+    'memory_copy_gb_per_s': (8, 3),
+    'memory_latency_ns': (200, 400),
+}
+
+class CheckResult:
+    """Résultat typé d'une vérification: composant, état, métriques et seuils appliqués"""
+    __slots__ = ('check', 'component', 'status', 'message', 'metrics', 'thresholds')
+
+    def __init__(self, check, component, status, message, metrics=None, thresholds=None):
+        self.check = check
+        self.component = component
+        self.status = status
+        self.message = message
+        self.metrics = metrics if metrics is not None else {}
+        self.thresholds = thresholds if thresholds is not None else {}
+
+    def __repr__(self):
+        return f"CheckResult({self.check!r}, {self.component!r}, {self.status})"
+
+    def to_dict(self):
+        return {
+            'check': self.check,
+            'component': self.component,
+            'status': self.status.value,
+            'message': self.message,
+            'metrics': self.metrics,
+            'thresholds': self.thresholds,
+        }
+
+def grade(value, threshold):
+    """Classe une valeur selon un seuil (avertissement, critique); un seuil décroissant signifie 'plus bas est pire'"""
+    if value is None:
+        return Status.OK
+    warning, critical = THRESHOLDS[threshold]
+    if warning <= critical:
+        return Status.CRITICAL if value >= critical else Status.WARNING if value >= warning else Status.OK
+    return Status.CRITICAL if value <= critical else Status.WARNING if value <= warning else Status.OK
+
+def worst(*statuses):
+    """État le plus grave parmi plusieurs"""
+    order = [Status.OK, Status.UNKNOWN, Status.WARNING, Status.CRITICAL]
+    return max(statuses, key=order.index)
+
+class _Probe:
+    """Mesure d'une sonde, utilisable en gestionnaire de contexte ou en décorateur"""
+    __slots__ = ('profiler', 'name', 'cpu', '_token', '_wall', '_cpu')
+
+    def __init__(self, profiler, name, cpu=True):
+        self.profiler = profiler
+        self.name = name
+        self.cpu = cpu
+        self._wall = None
+
+    def __enter__(self):
+        if self.profiler.enabled:
+            self._token = self.profiler._active.set(self.profiler._active.get() + (self.name,))
+            self._cpu = time.thread_time() if self.cpu else None
+            self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler.enabled and self._wall is not None:
+            wall = time.perf_counter() - self._wall
+            cpu = time.thread_time() - self._cpu if self.cpu else None
+            self.profiler._active.reset(self._token)
+            self.profiler._record(self.name, self._wall, wall, cpu)
+        self._wall = None
+
+    def __call__(self, func):
+        import inspect
+        profiler, name = self.profiler, self.name
+        if inspect.iscoroutinefunction(func):
+            # Le temps CPU d'une coroutine mélangerait celui des autres tâches de la boucle
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with _Probe(profiler, name, cpu=False):
+                    return await func(*args, **kwargs)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with _Probe(profiler, name, self.cpu):
+                    return func(*args, **kwargs)
+        return wrapper
+
+class Profiler:
+    """Registre des sondes: temps réel, temps CPU et sous-processus lancés par sonde, compteurs
+
+    Désactivé par défaut: une sonde ne coûte alors qu'un test de drapeau. Les sondes imbriquées
+    (suivies par contextvars, donc aussi à travers les tâches asyncio) se voient toutes
+    attribuer les sous-processus lancés sous elles.
+    """
+
+    def __init__(self):
+        import contextvars
+        self.enabled = False
+        self.stats = {}
+        self.counters = {}
+        self.events = None
+        self._active = contextvars.ContextVar('probes', default=())
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self, trace=False):
+        """Active l'enregistrement; `trace` garde aussi chaque appel pour une trace Chrome"""
+        self.enabled = True
+        self.events = [] if trace else None
+
+    def probe(self, name, cpu=True):
+        return _Probe(self, name, cpu)
+
+    def _entry(self, name):
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = {'calls': 0, 'wall': 0.0, 'cpu': None, 'subprocesses': 0}
+        return entry
+
+    def _record(self, name, start, wall, cpu):
+        with self._lock:
+            entry = self._entry(name)
+            entry['calls'] += 1
+            entry['wall'] += wall
+            if cpu is not None:
+                entry['cpu'] = (entry['cpu'] or 0.0) + cpu
+            if self.events is not None:
+                self.events.append({'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                                    'ts': (start - self._origin) * 1e6, 'dur': wall * 1e6})
+
+    def count(self, name, n=1):
+        """Incrémente un compteur (succès/échecs de cache...)"""
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def cache(self, name, hit):
+        self.count(f"cache.{name}.{'hit' if hit else 'miss'}")
+
+    def spawned(self):
+        """Signale un sous-processus lancé sous les sondes actives"""
+        if self.enabled:
+            with self._lock:
+                self.counters['subprocesses'] = self.counters.get('subprocesses', 0) + 1
+                for name in set(self._active.get()):
+                    self._entry(name)['subprocesses'] += 1
+
+    def report(self, out=None):
+        """Affiche les sondes par temps réel décroissant, puis les compteurs"""
+        out = out or sys.stderr
+        print(f"{'sonde':40} {'appels':>7} {'réel ms':>10} {'moy. ms':>9} {'CPU ms':>9} {'sous-proc.':>10}", file=out)
+        for name, entry in sorted(self.stats.items(), key=lambda item: item[1]['wall'], reverse=True):
+            cpu = f"{entry['cpu'] * 1000:9.1f}" if entry['cpu'] is not None else f"{'-':>9}"
+            print(f"{name:40} {entry['calls']:7} {entry['wall'] * 1000:10.1f} {entry['wall'] * 1000 / entry['calls']:9.2f} {cpu} {entry['subprocesses']:10}", file=out)
+        for name, value in sorted(self.counters.items()):
+            print(f"{name:40} {value:7}", file=out)
+
+    def dump_trace(self, path):
+        """Écrit les appels enregistrés au format Chrome trace (chrome://tracing, Perfetto)"""
+        import json
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events or [], 'displayTimeUnit': 'ms'}, f)
+
+PROFILER = Profiler()
+
+def profile_threads(profiles):
+    """Fonction pour threading.setprofile: démarre un cProfile par nouveau thread (Python < 3.12)"""
+    import cProfile
+
+    def start(*_):
+        profile = cProfile.Profile()
+        profiles.append(profile)
+        profile.enable()
+    return start
+
+def clear_screen():
+    """Nettoie l'écran par séquences ANSI (sans lancer de shell)"""
+    print("\033[H\033[2J\033[3J", end='', flush=True)
+
+class CpuSampler:
+    """Échantillonne l'usage CPU (global, par cœur et par processus) en arrière-plan"""
+
+    def __init__(self, interval=0.5, history=240, proc_interval=2.0):
+        self.interval = interval
+        self.proc_interval = proc_interval
+        self.samples = deque(maxlen=history)
+        self.processes = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_proc = 0.0
+        self._primed_at = time.monotonic()
+        self._proc_samples = 0
+        self._proc_ready = threading.Event()
+
+    def start(self):
+        """Amorce les compteurs puis lance le thread d'échantillonnage"""
+        if self._thread is None:
+            with self._lock:
+                psutil.cpu_percent(percpu=True)
+                self._primed_at = time.monotonic()
+            self.sample_processes()
+            self._thread = threading.Thread(target=self._run, name='cpu-sampler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if time.monotonic() - self._last_proc >= self.proc_interval:
+                self.sample_processes()
+
+    def sample(self):
+        """Ajoute un échantillon au tampon: delta depuis l'échantillon précédent, sans attente"""
+        with self._lock:
+            percpu = psutil.cpu_percent(percpu=True)
+            total = sum(percpu) / len(percpu) if percpu else 0.0
+            self.samples.append((time.monotonic(), total, percpu))
+        return total, percpu
+
+    def sample_processes(self):
+        """Met à jour l'usage CPU par processus (instances psutil réutilisées par process_iter)"""
+        snapshot = {}
+        for proc in psutil.process_iter(['name']):
+            try:
+                snapshot[proc.pid] = (proc.info['name'], proc.cpu_percent(None))
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        with self._lock:
+            self.processes = snapshot
+            self._last_proc = time.monotonic()
+            self._proc_samples += 1
+        # Le premier relevé ne fait qu'amorcer les compteurs: tous les processus y sont à 0%
+        if self._proc_samples > 1:
+            self._proc_ready.set()
+
+    def _window(self, window):
+        with self._lock:
+            samples = list(self.samples)
+        if not samples:
+            # Lecture juste après l'amorçage: on laisse au delta le temps d'être significatif
+            remaining = self.interval - (time.monotonic() - self._primed_at)
+            if remaining > 0:
+                time.sleep(remaining)
+            self.sample()
+            with self._lock:
+                samples = list(self.samples)
+        if window is None:
+            return samples[-1:]
+        since = samples[-1][0] - window
+        return [s for s in samples if s[0] >= since]
+
+    def cpu_percent(self, window=None):
+        """Usage CPU moyen sur les `window` dernières secondes (dernier échantillon par défaut)"""
+        samples = self._window(window)
+        return round(sum(s[1] for s in samples) / len(samples), 1)
+
+    def per_cpu_percent(self, window=None):
+        """Usage moyen de chaque cœur sur les `window` dernières secondes"""
+        samples = self._window(window)
+        return [round(sum(col) / len(samples), 1) for col in zip(*(s[2] for s in samples))]
+
+    def top_processes(self, n=5):
+        """Les n processus les plus gourmands du dernier relevé: [(pid, nom, %CPU)]"""
+        with self._lock:
+            processes = list(self.processes.items())
+        top = heapq.nlargest(n, processes, key=lambda item: item[1][1] or 0.0)
+        return [(pid, name, percent or 0.0) for pid, (name, percent) in top]
+
+    def wait_processes(self, timeout=None):
+        """Attend un relevé par processus mesuré sur une vraie fenêtre (au plus `timeout` secondes)"""
+        return self._proc_ready.wait(timeout)
+
+    def process_cpu_percent(self, pid):
+        """Dernier usage CPU connu d'un processus"""
+        with self._lock:
+            entry = self.processes.get(pid)
+        return entry[1] if entry else 0.0
+
+_sampler = None
+
+def get_sampler():
+    """Retourne l'échantillonneur CPU partagé, démarré à la première utilisation"""
+    global _sampler
+    if _sampler is None:
+        _sampler = CpuSampler().start()
+    return _sampler
+
+def cache_dir():
+    """Dossier de cache de l'outil"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'outil-diagnostic')
+
+def machine_id():
+    """Identifiant stable de la machine (machine-id, MachineGuid ou nom d'hôte)"""
+    for path in ('/etc/machine-id', '/var/lib/dbus/machine-id'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+            if value:
+                return value
+        except OSError:
+            pass
+    if platform.system() == "Windows":
+        try:
+            import winreg
+            key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Cryptography")
+            return winreg.QueryValueEx(key, "MachineGuid")[0]
+        except OSError:
+            pass
+    return platform.node()
+
+def cpu_model():
+    """Modèle du processeur (platform.processor() est souvent vide sous Linux)"""
+    model = platform.processor()
+    if not model or model == platform.machine():
+        try:
+            with open('/proc/cpuinfo') as f:
+                for line in f:
+                    if line.startswith('model name'):
+                        return line.split(':', 1)[1].strip()
+        except OSError:
+            pass
+    return model
+
+def boot_key():
+    """Clé valable jusqu'au prochain redémarrage de la machine"""
+    return f"{machine_id()}:{int(psutil.boot_time())}"
+
+class Inventory:
+    """Inventaire matériel: faits statiques persistés sur disque, métriques volatiles avec TTL par champ
+
+    Les faits statiques sont valables tant que la machine n'a pas redémarré (clé machine-id + heure
+    de démarrage). La résolution DNS de l'adresse IP se fait en arrière-plan et n'attend jamais
+    plus de `dns_wait` secondes: on affiche la dernière valeur connue.
+    """
+    TTL = {'cpu_freq': 5, 'memory': 2, 'disk': 30, 'ip_address': 300}
+
+    def __init__(self, path=None, dns_wait=0.2):
+        self.path = path or os.path.join(cache_dir(), 'inventory.json')
+        self.dns_wait = dns_wait
+        self._static = None
+        self._volatile = {}
+        self._lock = threading.Lock()
+        self._resolver = None
+
+    def _cache_key(self):
+        return boot_key()
+
+    def _load(self, key):
+        import json
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data.get('facts') if data.get('key') == key else None
+
+    def _save(self):
+        import json
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump({'key': self._static['key'], 'facts': self._static['facts']}, f)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    def static(self):
+        """Faits statiques, lus depuis le cache disque ou collectés une fois par démarrage"""
+        with self._lock:
+            if self._static is None:
+                key = self._cache_key()
+                facts = self._load(key)
+                PROFILER.cache('inventory.static', facts is not None)
+                if facts is None:
+                    freq = psutil.cpu_freq()
+                    facts = {
+                        'hostname': socket.gethostname(),
+                        'os': f"{platform.system()} {platform.release()}",
+                        'os_version': platform.version(),
+                        'architecture': platform.machine(),
+                        'processor': cpu_model(),
+                        'cpu_physical_cores': psutil.cpu_count(logical=False),
+                        'cpu_total_cores': psutil.cpu_count(logical=True),
+                        'cpu_freq_max': freq.max if freq and freq.max else None,
+                        'boot_time': psutil.boot_time(),
+                        'ip_address': None,
+                    }
+                    self._static = {'key': key, 'facts': facts}
+                    self._save()
+                else:
+                    self._static = {'key': key, 'facts': facts}
+            return self._static['facts']
+
+    def _cached(self, name, loader):
+        now = time.monotonic()
+        entry = self._volatile.get(name)
+        PROFILER.cache(f'inventory.{name}', entry is not None and entry[0] > now)
+        if entry is None or entry[0] <= now:
+            with PROFILER.probe(f'inventory.{name}'):
+                entry = (now + self.TTL[name], loader())
+            self._volatile[name] = entry
+        return entry[1]
+
+    def volatile(self, name):
+        """Valeur psutil brute d'un champ volatil ('cpu_freq', 'memory' ou 'disk'), selon son TTL"""
+        loaders = {'cpu_freq': psutil.cpu_freq, 'memory': psutil.virtual_memory, 'disk': lambda: psutil.disk_usage('/')}
+        return self._cached(name, loaders[name])
+
+    def _resolve_ip(self):
+        try:
+            with PROFILER.probe('dns.gethostbyname'):
+                ip = socket.gethostbyname(self.static()['hostname'])
+        except OSError:
+            ip = None
+        with self._lock:
+            self._volatile['ip_address'] = (time.monotonic() + self.TTL['ip_address'], ip)
+            if ip and self._static['facts'].get('ip_address') != ip:
+                self._static['facts']['ip_address'] = ip
+                self._save()
+            self._resolver = None
+
+    def ip_address(self):
+        """Adresse IP, résolue en arrière-plan; la dernière valeur connue est servie sans attendre"""
+        entry = self._volatile.get('ip_address')
+        PROFILER.cache('inventory.ip_address', entry is not None and entry[0] > time.monotonic())
+        if entry is None or entry[0] <= time.monotonic():
+            with self._lock:
+                if self._resolver is None:
+                    self._resolver = threading.Thread(target=self._resolve_ip, name='dns-resolver', daemon=True)
+                    self._resolver.start()
+                resolver = self._resolver
+            if entry is None:
+                resolver.join(self.dns_wait)
+            entry = self._volatile.get('ip_address', entry)
+        return (entry[1] if entry else None) or self.static().get('ip_address') or "N/A"
+
+    def system_info(self):
+        """Même contenu que get_system_info(), en ne relisant que les champs expirés"""
+        facts = self.static()
+        info = {k: facts[k] for k in ('hostname', 'os', 'os_version', 'architecture', 'processor', 'cpu_physical_cores', 'cpu_total_cores')}
+        freq = self.volatile('cpu_freq')
+        info['cpu_freq'] = freq.current if freq else "N/A"
+        
+        mem = self.volatile('memory')
+        info['ram_total'] = f"{mem.total / (1024**3):.2f} GB"
+        info['ram_used'] = f"{mem.used / (1024**3):.2f} GB"
+        info['ram_percent'] = f"{mem.percent}%"
+        
+        disk = self.volatile('disk')
+        info['disk_total'] = f"{disk.total / (1024**3):.2f} GB"
+        info['disk_used'] = f"{disk.used / (1024**3):.2f} GB"
+        info['disk_percent'] = f"{disk.percent}%"
+        
+        info['ip_address'] = self.ip_address()
+        
+        uptime = datetime.now() - datetime.fromtimestamp(facts['boot_time'])
+        info['uptime'] = str(uptime).split('.')[0]
+        return info
+
+_inventory = None
+
+def get_inventory():
+    """Retourne l'inventaire partagé"""
+    global _inventory
+    if _inventory is None:
+        _inventory = Inventory()
+    return _inventory
+
+def get_system_info():
+    """Récupère les informations système de base"""
+    return get_inventory().system_info()
+
+def display_system_info():
+    """Affiche les informations système style neofetch"""
+    clear_screen()
+    info = get_system_info()
+    
+    print(f"{Colors.CYAN}{'='*60}{Colors.ENDC}")
+    print(f"{Colors.BOLD}{Colors.BLUE}     Outil diagnostic v1.0{Colors.ENDC}")
+    print(f"{Colors.CYAN}{'='*60}{Colors.ENDC}\n")
+    
+    if platform.system() == "Windows":
+        logo = """
+        ████████████████
+        ████████████████
+        ████  ████  ████
+        ████  ████  ████
+        ████████████████
+        ████████████████
+        ████  ████  ████
+        ████  ████  ████
+        ████████████████
+        ████████████████
+        """
+    else:
+        logo = """
+           .--.
+          |o_o |
+          |:_/ |
+         //   \ \\
+        (|     | )
+       /'\_   _/`\\
+       \___)=(___/
+        """
+    
+    logo_lines = logo.strip().split('\n')
+    
+    print(f"{Colors.GREEN}Informations Système:{Colors.ENDC}")
+    print(f"{Colors.CYAN}{'─'*60}{Colors.ENDC}")
+    
+    print(f"{Colors.BOLD}Hostname:{Colors.ENDC} {info['hostname']}")
+    print(f"{Colors.BOLD}OS:{Colors.ENDC} {info['os']}")
+    print(f"{Colors.BOLD}Architecture:{Colors.ENDC} {info['architecture']}")
+    print(f"{Colors.BOLD}Processeur:{Colors.ENDC} {info['processor'][:50]}...")
+    print(f"{Colors.BOLD}CPU Cores:{Colors.ENDC} {info['cpu_physical_cores']} physiques / {info['cpu_total_cores']} logiques")
+    print(f"{Colors.BOLD}CPU Freq:{Colors.ENDC} {info['cpu_freq']} MHz")
+    print(f"{Colors.BOLD}RAM:{Colors.ENDC} {info['ram_used']} / {info['ram_total']} ({info['ram_percent']})")
+    print(f"{Colors.BOLD}Disque:{Colors.ENDC} {info['disk_used']} / {info['disk_total']} ({info['disk_percent']})")
+    print(f"{Colors.BOLD}IP:{Colors.ENDC} {info['ip_address']}")
+    print(f"{Colors.BOLD}Uptime:{Colors.ENDC} {info['uptime']}")
+    
+    print(f"\n{Colors.CYAN}{'─'*60}{Colors.ENDC}")
+
+def get_smart_attribute(output, attr_name, column=9):
+    """Helper to parse SMART attribute from smartctl output"""
+    lines = output.split('\n')
+    for line in lines:
+        if attr_name in line:
+            parts = line.split()
+            if len(parts) > column:
+                return parts[column]
+    return "N/A"
+
+SMARTCTL = os.environ.get('SMARTCTL', 'smartctl')
+SMART_TIMEOUT = 30
+SMART_WORKERS = 8
+
+async def run_command(cmd, timeout):
+    """Lance une commande sans bloquer la boucle et retourne sa sortie standard (texte)
+
+    Lève asyncio.TimeoutError si `timeout` est dépassé. Sur délai comme sur annulation de la
+    tâche, le processus est tué et attendu: il ne survit jamais à l'appel. Hors Windows, il est
+    lancé dans sa propre session et tout son groupe est tué, y compris les processus qu'il a
+    lancés à son tour (un script enveloppe, sudo...) et qui garderaient sinon la sortie ouverte.
+    """
+    import asyncio
+    import signal
+    with PROFILER.probe(f'subprocess.{os.path.basename(cmd[0])}', cpu=False):
+        proc = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+                                                    start_new_session=os.name != 'nt')
+        PROFILER.spawned()
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout)
+        except BaseException:
+            with contextlib.suppress(ProcessLookupError):
+                if os.name != 'nt':
+                    os.killpg(proc.pid, signal.SIGKILL)
+                elif proc.returncode is None:
+                    proc.kill()
+            await proc.wait()
+            raise
+    return stdout.decode(errors='replace')
+
+async def smartctl_version():
+    """Retourne la version de smartctl sous forme de tuple, ou None s'il est absent"""
+    import asyncio
+    try:
+        output = await run_command([SMARTCTL, '--version'], SMART_TIMEOUT)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    match = re.search(r'smartctl (\d+)\.(\d+)', output)
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+def physical_devices(device):
+    """Retrouve le ou les disques physiques qui portent une partition"""
+    if platform.system() == "Windows":
+        return (r'\\.\PhysicalDrive' + device.replace('\\', '').replace(':', ''),)
+    if not device.startswith('/dev/'):
+        return ()
+    name = os.path.basename(os.path.realpath(device))
+    sys_path = f'/sys/class/block/{name}'
+    if os.path.isdir(sys_path):
+        slaves_dir = os.path.join(sys_path, 'slaves')
+        slaves = sorted(os.listdir(slaves_dir)) if os.path.isdir(slaves_dir) else []
+        if slaves:
+            found = []
+            for slave in slaves:
+                for parent in physical_devices(f'/dev/{slave}'):
+                    if parent not in found:
+                        found.append(parent)
+            return tuple(found)
+        if os.path.exists(os.path.join(sys_path, 'partition')):
+            return (f'/dev/{os.path.basename(os.path.dirname(os.path.realpath(sys_path)))}',)
+        return (f'/dev/{name}',)
+    match = re.match(r'^(.*\d)p\d+$', name) or re.match(r'^(.*[a-z])\d+$', name)
+    return (f'/dev/{match.group(1) if match else name}',)
+
+def parse_smart_json(data):
+    """Extrait santé et usure depuis la sortie JSON de smartctl"""
+    table = {a['name']: a for a in data.get('ata_smart_attributes', {}).get('table', [])}
+    nvme_log = data.get('nvme_smart_health_information_log', {})
+    device_type = data.get('device', {}).get('type', '')
+    passed = data.get('smart_status', {}).get('passed')
+
+    smart = {
+        'is_ssd': data.get('rotation_rate') == 0 or device_type == 'nvme' or bool(nvme_log),
+        'health': "OK" if passed else ("Problème détecté" if passed is False else "N/A"),
+        'life_percent': None,
+        'reallocated': "N/A",
+        'power_hours': "N/A",
+    }
+    if 'percentage_used' in nvme_log:
+        smart['life_percent'] = 100 - int(nvme_log['percentage_used'])
+    else:
+        for name in ("Media_Wearout_Indicator", "Wear_Leveling_Count"):
+            if name in table:
+                smart['life_percent'] = int(table[name]['value'])
+                break
+        else:
+            if "Percentage_Used" in table:
+                smart['life_percent'] = 100 - int(table["Percentage_Used"]['raw']['value'])
+    if "Reallocated_Sector_Ct" in table:
+        smart['reallocated'] = str(table["Reallocated_Sector_Ct"]['raw']['value'])
+    if "Power_On_Hours" in table:
+        smart['power_hours'] = str(table["Power_On_Hours"]['raw']['value'])
+    elif 'power_on_hours' in nvme_log:
+        smart['power_hours'] = str(nvme_log['power_on_hours'])
+    return smart
+
+def parse_smart_text(output):
+    """Extrait santé et usure depuis la sortie texte de smartctl -i -H -A"""
+    smart = {
+        'is_ssd': "Solid State Device" in output or "SSD" in output or "NVMe" in output,
+        'health': "OK" if "PASSED" in output or ": OK" in output else "Problème détecté",
+        'life_percent': None,
+        'reallocated': get_smart_attribute(output, "Reallocated_Sector_Ct"),
+        'power_hours': get_smart_attribute(output, "Power_On_Hours"),
+    }
+    for name in ("Media_Wearout_Indicator", "Wear_Leveling_Count"):
+        value = get_smart_attribute(output, name, column=3)
+        if value.isdigit():
+            smart['life_percent'] = int(value)
+            break
+    else:
+        match = re.search(r'Percentage Used:\s+(\d+)%', output)
+        if match:
+            smart['life_percent'] = 100 - int(match.group(1))
+    return smart
+
+async def query_smart(device, use_json=True, timeout=SMART_TIMEOUT):
+    """Interroge un disque physique avec un seul appel smartctl"""
+    import asyncio
+    import json
+    with PROFILER.probe('smart.query', cpu=False):
+        cmd = [SMARTCTL, '-i', '-H', '-A'] + (['-j'] if use_json else []) + [device]
+        try:
+            # smartctl encode des avertissements dans son code retour: seule la sortie compte
+            output = await run_command(cmd, timeout)
+        except asyncio.TimeoutError:
+            return {'error': f"Délai dépassé ({timeout}s)"}
+        except OSError as e:
+            return {'error': str(e)}
+        if use_json:
+            try:
+                data = json.loads(output)
+            except ValueError:
+                return parse_smart_text(output)
+            messages = data.get('smartctl', {}).get('messages', [])
+            if 'smart_status' not in data and messages:
+                return {'error': messages[0].get('string', "Réponse smartctl invalide")}
+            return parse_smart_json(data)
+        return parse_smart_text(output)
+
+async def collect_smart(devices, use_json=True, max_workers=SMART_WORKERS, timeout=SMART_TIMEOUT):
+    """Interroge en parallèle chaque disque physique une seule fois (au plus max_workers smartctl à la fois)"""
+    import asyncio
+    devices = sorted(set(devices))
+    limit = asyncio.Semaphore(max_workers)
+
+    async def bounded(device):
+        async with limit:
+            return await query_smart(device, use_json, timeout)
+
+    return dict(zip(devices, await asyncio.gather(*(bounded(dev) for dev in devices))))
+
+def describe_disk_life(smart):
+    """Formate l'estimation de durée de vie d'un disque à partir des données SMART"""
+    if smart['is_ssd']:
+        life_percent = f"{smart['life_percent']}%" if smart['life_percent'] is not None else "N/A"
+        return f"{life_percent} restante (basé sur usure)"
+    return f"Basé sur erreurs: {smart['reallocated']} secteurs réalloués, Heures allumé: {smart['power_hours']}. Typique >5 ans si erreurs basses."
+
+# Cibles sondées par défaut (hôte, port, protocole); surchargeables par OUTIL_DIAG_TARGETS
+NETWORK_TARGETS = [('8.8.8.8', 53, 'tcp'), ('1.1.1.1', 53, 'tcp'), ('8.8.8.8', 53, 'udp')]
+PROBE_CONCURRENCY = 64
+
+def parse_target(text):
+    """Analyse une cible 'hôte:port[/tcp|/udp]' (IPv6 entre crochets)"""
+    proto = 'tcp'
+    if '/' in text:
+        text, proto = text.rsplit('/', 1)
+        proto = proto.lower()
+        if proto not in ('tcp', 'udp'):
+            raise ValueError(f"Protocole inconnu: {proto}")
+    host, _, port = text.rpartition(':')
+    if not host or not port.isdigit():
+        raise ValueError(f"Cible invalide: {text} (attendu hôte:port[/tcp|/udp])")
+    return host.strip('[]'), int(port), proto
+
+def network_targets():
+    """Cibles configurées: OUTIL_DIAG_TARGETS (séparées par des virgules) ou NETWORK_TARGETS"""
+    configured = os.environ.get('OUTIL_DIAG_TARGETS')
+    if configured:
+        return [parse_target(t.strip()) for t in configured.split(',') if t.strip()]
+    return list(NETWORK_TARGETS)
+
+def _probe_payload(port):
+    # Sur le port 53, une vraie requête DNS (NS de la racine) pour obtenir une réponse du serveur
+    if port == 53:
+        return os.urandom(2) + b'\x01\x00\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x02\x00\x01'
+    return b'outil-diagnostic probe'
+
+async def probe_tcp(address, port, timeout):
+    """Durée d'établissement d'une connexion TCP en secondes, None en cas d'échec"""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return None
+    rtt = loop.time() - start
+    writer.close()
+    return rtt
+
+async def probe_udp(address, port, timeout):
+    """Aller-retour d'un datagramme UDP (réponse quelconque) en secondes, None si perdu"""
+    import asyncio
+    loop = asyncio.get_running_loop()
+    reply = loop.create_future()
+
+    class Protocol(asyncio.DatagramProtocol):
+        def datagram_received(self, data, addr):
+            if not reply.done():
+                reply.set_result(loop.time())
+
+        def error_received(self, exc):
+            if not reply.done():
+                reply.set_exception(exc)
+
+    try:
+        transport, _ = await loop.create_datagram_endpoint(Protocol, remote_addr=(address, port))
+    except OSError:
+        return None
+    try:
+        start = loop.time()
+        transport.sendto(_probe_payload(port))
+        return await asyncio.wait_for(reply, timeout) - start
+    except (OSError, asyncio.TimeoutError):
+        return None
+    finally:
+        transport.close()
+
+def probe_stats(rtts):
+    """min/moyenne/p99/gigue (ms) et taux de perte (%) d'une série de mesures (None = perdu)"""
+    received = [rtt * 1000 for rtt in rtts if rtt is not None]
+    stats = {'sent': len(rtts), 'received': len(received), 'loss_percent': 100.0 * (len(rtts) - len(received)) / len(rtts) if rtts else 100.0}
+    if not received:
+        return dict(stats, min_ms=None, avg_ms=None, p99_ms=None, jitter_ms=None)
+    ordered = sorted(received)
+    # Gigue: écart moyen entre mesures successives (dans l'ordre d'envoi)
+    deltas = [abs(b - a) for a, b in zip(received, received[1:])]
+    return dict(
+        stats,
+        min_ms=ordered[0],
+        avg_ms=sum(received) / len(received),
+        p99_ms=ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))],
+        jitter_ms=sum(deltas) / len(deltas) if deltas else 0.0,
+    )
+
+async def network_probe(targets, count=10, interval=0.05, timeout=1.0):
+    """Sonde toutes les cibles en parallèle: `count` mesures par cible espacées de `interval` secondes
+
+    Les noms d'hôte sont résolus une seule fois, hors mesure. Retourne {"hôte:port/proto": stats}.
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    limit = asyncio.Semaphore(PROBE_CONCURRENCY)
+
+    async def one(address, port, proto, delay):
+        await asyncio.sleep(delay)
+        async with limit:
+            return await (probe_udp if proto == 'udp' else probe_tcp)(address, port, timeout)
+
+    async def target(host, port, proto):
+        kind = socket.SOCK_DGRAM if proto == 'udp' else socket.SOCK_STREAM
+        try:
+            infos = await asyncio.wait_for(loop.getaddrinfo(host, port, type=kind), timeout)
+            address = infos[0][4][0]
+        except (OSError, asyncio.TimeoutError):
+            return [None] * count
+        return await asyncio.gather(*(one(address, port, proto, i * interval) for i in range(count)))
+
+    with PROFILER.probe('network.probe', cpu=False):
+        series = await asyncio.gather(*(target(*t) for t in targets))
+    return {f"{host}:{port}/{proto}": probe_stats(rtts) for (host, port, proto), rtts in zip(targets, series)}
+
+def format_probe(stats):
+    """Résumé texte des statistiques d'une cible"""
+    if stats['avg_ms'] is None:
+        return f"injoignable (perte {stats['loss_percent']:.0f}%)"
+    return (
+        f"{stats['avg_ms']:.2f} ms (min {stats['min_ms']:.2f}, p99 {stats['p99_ms']:.2f}, "
+        f"gigue {stats['jitter_ms']:.2f} ms, perte {stats['loss_percent']:.0f}%)"
+    )
+
+async def echo_server(host='127.0.0.1', port=7007):
+    """Serveur d'écho TCP et UDP pour tester les sondes localement"""
+    import asyncio
+    loop = asyncio.get_running_loop()
+
+    async def handle(reader, writer):
+        try:
+            while data := await reader.read(4096):
+                writer.write(data)
+                await writer.drain()
+        finally:
+            writer.close()
+
+    class Echo(asyncio.DatagramProtocol):
+        def connection_made(self, transport):
+            self.transport = transport
+
+        def datagram_received(self, data, addr):
+            self.transport.sendto(data, addr)
+
+    server = await asyncio.start_server(handle, host, port)
+    transport, _ = await loop.create_datagram_endpoint(Echo, local_addr=(host, port))
+    return server, transport
+
+# Puces hwmon (contenu du fichier 'name') qui mesurent le CPU
+CPU_SENSOR_CHIPS = ('coretemp', 'k10temp', 'zenpower', 'cpu_thermal', 'cpu-thermal', 'x86_pkg_temp')
+POWER_SUPPLY_ATTRS = ('status', 'online', 'capacity', 'cycle_count', 'charge_full', 'charge_full_design',
+                      'energy_full', 'energy_full_design')
+
+class SysfsReader:
+    """Lecture rapide des capteurs Linux (hwmon, thermal_zone, power_supply)
+
+    Les nœuds sont découverts une fois et leurs descripteurs restent ouverts: une relecture ne
+    coûte qu'un pread par valeur. `root` permet de pointer vers une arborescence factice.
+    """
+
+    def __init__(self, root=None):
+        self.root = root or os.environ.get('OUTIL_DIAG_SYSFS', '/sys')
+        self._fds = {}
+        self.hwmon = []
+        self.thermal = []
+        self.power_supplies = {}
+        self.supply_types = {}
+        self._discover()
+
+    def _open(self, path):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return None
+        self._fds[path] = fd
+        return path
+
+    def _read_once(self, path):
+        try:
+            with open(path) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _entries(self, directory, prefix):
+        try:
+            names = [name for name in os.listdir(directory) if name.startswith(prefix)]
+        except OSError:
+            return []
+        return sorted(names, key=lambda name: (len(name), name))
+
+    def _discover(self):
+        hwmon_dir = os.path.join(self.root, 'class', 'hwmon')
+        for chip in self._entries(hwmon_dir, 'hwmon'):
+            chip_dir = os.path.join(hwmon_dir, chip)
+            name = self._read_once(os.path.join(chip_dir, 'name')) or chip
+            sensors = []
+            for entry in self._entries(chip_dir, 'temp'):
+                if entry.endswith('_input'):
+                    path = self._open(os.path.join(chip_dir, entry))
+                    if path:
+                        label = self._read_once(os.path.join(chip_dir, entry.replace('_input', '_label'))) or ''
+                        sensors.append((label, path))
+            if sensors:
+                self.hwmon.append((name, sensors))
+        thermal_dir = os.path.join(self.root, 'class', 'thermal')
+        for zone in self._entries(thermal_dir, 'thermal_zone'):
+            path = self._open(os.path.join(thermal_dir, zone, 'temp'))
+            if path:
+                self.thermal.append((self._read_once(os.path.join(thermal_dir, zone, 'type')) or zone, path))
+        supply_dir = os.path.join(self.root, 'class', 'power_supply')
+        for supply in self._entries(supply_dir, ''):
+            self.supply_types[supply] = self._read_once(os.path.join(supply_dir, supply, 'type'))
+            attrs = {}
+            for attr in POWER_SUPPLY_ATTRS:
+                path = self._open(os.path.join(supply_dir, supply, attr))
+                if path:
+                    attrs[attr] = path
+            if attrs:
+                self.power_supplies[supply] = attrs
+
+    def read(self, path):
+        """Relit une valeur (texte) par pread sur le descripteur déjà ouvert"""
+        fd = self._fds.get(path)
+        if fd is None:
+            return None
+        try:
+            return os.pread(fd, 64, 0).decode(errors='replace').strip()
+        except OSError:
+            return None
+
+    def read_int(self, path):
+        text = self.read(path)
+        try:
+            return int(text)
+        except (TypeError, ValueError):
+            return None
+
+    def temperatures(self):
+        """Températures en °C par puce hwmon: {nom: [(libellé, valeur)]}, puis zones thermiques"""
+        temps = {}
+        for name, sensors in self.hwmon:
+            for label, path in sensors:
+                value = self.read_int(path)
+                if value is not None:
+                    temps.setdefault(name, []).append((label, value / 1000))
+        for zone_type, path in self.thermal:
+            value = self.read_int(path)
+            if value is not None:
+                temps.setdefault(f"thermal_zone:{zone_type}", []).append(('', value / 1000))
+        return temps
+
+    def cpu_temperature(self):
+        """Température CPU: première sonde d'une puce CPU connue, sinon d'une zone thermique CPU"""
+        candidates = [(name, sensors) for name, sensors in self.hwmon] + [(zone, [('', path)]) for zone, path in self.thermal]
+        for name, sensors in candidates:
+            lowered = name.lower()
+            if lowered in CPU_SENSOR_CHIPS or 'cpu' in lowered or 'core' in lowered:
+                for _, path in sensors:
+                    value = self.read_int(path)
+                    if value is not None:
+                        return value / 1000
+        return None
+
+    def battery(self):
+        """État de la première batterie (type Battery), ou None"""
+        for supply, attrs in self.power_supplies.items():
+            if self.supply_types.get(supply) != 'Battery':
+                continue
+            percent = self.read_int(attrs.get('capacity'))
+            if percent is None:
+                continue
+            status = self.read(attrs.get('status'))
+            mains = [a for name, a in self.power_supplies.items() if self.supply_types.get(name) == 'Mains']
+            plugged = any(self.read_int(a.get('online')) for a in mains) if mains else status in ('Charging', 'Full', 'Not charging')
+            full = self.read_int(attrs.get('charge_full')) or self.read_int(attrs.get('energy_full'))
+            design = self.read_int(attrs.get('charge_full_design')) or self.read_int(attrs.get('energy_full_design'))
+            cycles = self.read_int(attrs.get('cycle_count'))
+            return {
+                'percent': percent, 'plugged': plugged, 'cycles': str(cycles) if cycles is not None else None,
+                'capacity_percent': round(full / design * 100, 1) if full and design else None,
+            }
+        return None
+
+    def close(self):
+        for fd in self._fds.values():
+            os.close(fd)
+        self._fds.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_sysfs = None
+
+def get_sysfs():
+    """Retourne le lecteur sysfs partagé (Linux uniquement, None ailleurs)"""
+    global _sysfs
+    if _sysfs is None and platform.system() == "Linux":
+        _sysfs = SysfsReader()
+    return _sysfs
+
+# Collecteur: nom, fonction (synchrone ou coroutine, reçoit les données de ses dépendances en
+# paramètres nommés), classe de coût, validité des données (s), dépendances, délai max (s)
+Collector = namedtuple('Collector', 'name func cost refresh depends timeout', defaults=((), 10))
+COST_CLASSES = ('cheap', 'moderate', 'expensive')
+COLLECTORS = {}
+
+def register_collector(collector):
+    """Déclare un collecteur; ses dépendances doivent déjà être déclarées"""
+    if collector.cost not in COST_CLASSES:
+        raise ValueError(f"Classe de coût inconnue pour {collector.name}: {collector.cost}")
+    missing = [name for name in collector.depends if name not in COLLECTORS]
+    if missing:
+        raise ValueError(f"Dépendances inconnues pour {collector.name}: {', '.join(missing)}")
+    COLLECTORS[collector.name] = collector
+    return collector
+
+def read_cpu():
+    """Charge CPU moyenne sur 5 s, depuis l'échantillonneur de fond"""
+    with PROFILER.probe('sampler.cpu_percent'):
+        return {'usage_percent': get_sampler().cpu_percent(window=5)}
+
+def read_temperatures():
+    """Températures des capteurs et température CPU retenue"""
+    sysfs = get_sysfs()
+    if sysfs is not None:
+        with PROFILER.probe('sysfs.temperatures'):
+            sensors = {name: [value for _, value in entries] for name, entries in sysfs.temperatures().items()}
+            return {'sensors': sensors, 'cpu_c': sysfs.cpu_temperature()}
+    if not hasattr(psutil, 'sensors_temperatures'):
+        return {'sensors': {}, 'cpu_c': None}
+    with PROFILER.probe('psutil.sensors_temperatures'):
+        temps = psutil.sensors_temperatures()
+    sensors = {name: [entry.current for entry in entries] for name, entries in (temps or {}).items()}
+    cpu_temp = next((values[0] for name, values in sensors.items()
+                     if values and ('cpu' in name.lower() or 'core' in name.lower())), None)
+    return {'sensors': sensors, 'cpu_c': cpu_temp}
+
+def read_memory():
+    """Occupation de la RAM"""
+    mem = psutil.virtual_memory()
+    return {'percent': mem.percent, 'total': mem.total, 'used': mem.used, 'available': mem.available}
+
+def read_disk():
+    """Partitions montées, leur occupation et les disques physiques qui les portent"""
+    with PROFILER.probe('psutil.disk_partitions'):
+        partitions = [p for p in psutil.disk_partitions() if p.mountpoint]
+    rows = []
+    for partition in partitions:
+        row = {'device': partition.device, 'mountpoint': partition.mountpoint,
+               'physical_devices': list(physical_devices(partition.device))}
+        try:
+            row['usage_percent'] = psutil.disk_usage(partition.mountpoint).percent
+        except OSError as e:
+            row['usage_percent'], row['error'] = None, str(e)
+        rows.append(row)
+    return {'partitions': rows}
+
+async def read_smart(disk):
+    """Santé SMART de chaque disque physique (un seul smartctl par disque)"""
+    version = await smartctl_version()
+    if version is None:
+        return {'available': False, 'devices': {}}
+    devices = [d for partition in disk['partitions'] for d in partition['physical_devices']]
+    return {'available': True, 'devices': await collect_smart(devices, use_json=version >= (7, 0))}
+
+async def read_network():
+    """Joignabilité des cibles réseau configurées"""
+    return {'targets': await network_probe(network_targets(), count=3, timeout=3)}
+
+def read_battery():
+    """État de la batterie, None si absente"""
+    sysfs = get_sysfs()
+    if sysfs is not None:
+        with PROFILER.probe('sysfs.battery'):
+            return sysfs.battery()
+    with PROFILER.probe('psutil.sensors_battery'):
+        battery = psutil.sensors_battery() if hasattr(psutil, 'sensors_battery') else None
+    if not battery:
+        return None
+    return {'percent': battery.percent, 'plugged': battery.power_plugged, 'cycles': None, 'capacity_percent': None}
+
+for _collector in (
+    Collector('cpu', read_cpu, 'cheap', 5),
+    Collector('temperatures', read_temperatures, 'cheap', 5),
+    Collector('memory', read_memory, 'cheap', 2),
+    Collector('disk', read_disk, 'cheap', 30),
+    Collector('smart', read_smart, 'expensive', 600, ('disk',), SMART_TIMEOUT + 10),
+    Collector('network', read_network, 'moderate', 60),
+    Collector('battery', read_battery, 'cheap', 30),
+):
+    register_collector(_collector)
+
+class CollectorCache:
+    """Dernières données de chaque collecteur, persistées sur disque jusqu'au prochain redémarrage"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(cache_dir(), 'collectors.json')
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        import json
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            self._entries = data.get('entries', {}) if data.get('key') == boot_key() else {}
+        return self._entries
+
+    def get(self, name):
+        """(horodatage, données) du dernier relevé, ou None"""
+        with self._lock:
+            entry = self._load().get(name)
+        return (entry['ts'], entry['data']) if entry else None
+
+    def put(self, name, data):
+        import json
+        with self._lock:
+            entries = self._load()
+            entries[name] = {'ts': time.time(), 'data': data}
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, 'w') as f:
+                    json.dump({'key': boot_key(), 'entries': entries}, f, default=str)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+_collector_cache = None
+
+def get_collector_cache():
+    """Retourne le cache de collecteurs partagé"""
+    global _collector_cache
+    if _collector_cache is None:
+        _collector_cache = CollectorCache()
+    return _collector_cache
+
+class CollectionRun:
+    """Collecte pour une exécution du planificateur
+
+    Chaque collecteur tourne au plus une fois, après ses dépendances et en parallèle des autres,
+    et seulement si ses données en cache ont expiré (ou si `fresh`). Un collecteur plus coûteux
+    que `max_cost` n'est jamais lancé: on sert ses dernières données, même périmées.
+    """
+
+    def __init__(self, cache=None, fresh=False, max_cost='expensive'):
+        self.cache = cache or get_collector_cache()
+        self.fresh = fresh
+        self.max_cost = COST_CLASSES.index(max_cost)
+        self._tasks = {}
+
+    async def get(self, name):
+        import asyncio
+        task = self._tasks.get(name)
+        if task is None:
+            task = self._tasks[name] = asyncio.ensure_future(self._collect(COLLECTORS[name]))
+        # Partagé entre vérifications: le délai dépassé de l'une n'annule pas la collecte
+        return await asyncio.shield(task)
+
+    async def close(self):
+        """Annule les collectes encore en cours et attend leur fin (processus fils compris)"""
+        import asyncio
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _collect(self, collector):
+        import asyncio
+        cached = self.cache.get(collector.name)
+        fresh = cached is not None and time.time() - cached[0] < collector.refresh
+        PROFILER.cache(f'collector.{collector.name}', fresh and not self.fresh)
+        if fresh and not self.fresh:
+            return cached[1]
+        if COST_CLASSES.index(collector.cost) > self.max_cost:
+            if cached is not None:
+                return cached[1]
+            raise RuntimeError(f"pas de données en cache pour le collecteur {collector.name} ({collector.cost})")
+        values = await asyncio.gather(*(self.get(name) for name in collector.depends))
+        kwargs = dict(zip(collector.depends, values))
+        with PROFILER.probe(f'collector.{collector.name}', cpu=False):
+            if asyncio.iscoroutinefunction(collector.func):
+                pending = collector.func(**kwargs)
+            else:
+                pending = asyncio.get_running_loop().run_in_executor(None, functools.partial(collector.func, **kwargs))
+            data = await asyncio.wait_for(pending, collector.timeout)
+        self.cache.put(collector.name, data)
+        return data
+
+def check_cpu(cpu, temperatures):
+    """Vérifie la charge et la température du CPU"""
+    cpu_percent = cpu['usage_percent']
+    cpu_temp = temperatures['cpu_c']
+    cpu_life = "N/A (Durée de vie typique: >10 ans si températures <85°C)"
+    
+    temp_text = f"{cpu_temp}°C" if cpu_temp is not None else "N/A"
+    status = worst(grade(cpu_percent, 'cpu_usage_percent'), grade(cpu_temp, 'cpu_temperature_c'))
+    label = "OK" if status is Status.OK else "Charge ou température élevée"
+    return [CheckResult(
+        'cpu', "CPU", status,
+        f"CPU: {label} (Usage: {cpu_percent}%, Temp: {temp_text}, Durée de vie estimée: {cpu_life})",
+        {'usage_percent': cpu_percent, 'temperature_c': cpu_temp},
+        {k: THRESHOLDS[k] for k in ('cpu_usage_percent', 'cpu_temperature_c')},
+    )]
+
+def check_memory(memory):
+    """Vérifie l'occupation de la RAM"""
+    status = grade(memory['percent'], 'memory_usage_percent')
+    label = "OK" if status is Status.OK else "Usage élevé"
+    mem_life = "N/A (Pas de métrique standard; durée de vie typique: >10 ans sans erreurs)"
+    return [CheckResult(
+        'memory', "RAM", status,
+        f"RAM: {label} (Usage: {memory['percent']}%, Durée de vie estimée: {mem_life})",
+        {'usage_percent': memory['percent'], 'total_bytes': memory['total'], 'used_bytes': memory['used']},
+        {'memory_usage_percent': THRESHOLDS['memory_usage_percent']},
+    )]
+
+def space_hint(partition, status):
+    """Suggestion d'analyse de l'espace pour une partition trop pleine"""
+    return f" (analyse: tool.py space {partition['mountpoint']})" if status is not Status.OK else ""
+
+def check_disks(disk, smart):
+    """Vérifie l'espace et la santé SMART de chaque partition"""
+    results = []
+    thresholds = {'disk_usage_percent': THRESHOLDS['disk_usage_percent']}
+    if not smart['available']:
+        results.append(CheckResult(
+            'smartmontools', "smartmontools", Status.UNKNOWN,
+            "smartmontools non installé - Impossible d'estimer durée de vie des disques. Installez via apt/yum ou téléchargez pour Windows.",
+        ))
+    
+    for partition in disk['partitions']:
+        device, usage = partition['device'], partition['usage_percent']
+        metrics = {'mountpoint': partition['mountpoint'], 'usage_percent': usage}
+        if usage is None:
+            results.append(CheckResult(
+                'disk', device, Status.UNKNOWN,
+                f"Disque {device}: Erreur - {partition.get('error', 'usage inconnu')}", metrics, thresholds,
+            ))
+            continue
+        space_status = grade(usage, 'disk_usage_percent')
+        label = "OK" if space_status is Status.OK else "Espace faible"
+        if not smart['available']:
+            results.append(CheckResult(
+                'disk', device, space_status,
+                f"Disque {device}: {label} (Usage: {usage}%) - Pas d'info durée de vie sans smartmontools{space_hint(partition, space_status)}",
+                metrics, thresholds,
+            ))
+            continue
+        reports = [smart['devices'].get(d, {'error': "disque non interrogé"}) for d in partition['physical_devices']]
+        errors = [r['error'] for r in reports if 'error' in r]
+        if not reports or errors:
+            reason = errors[0] if errors else "pas de disque physique associé"
+            results.append(CheckResult(
+                'disk', device, worst(space_status, Status.UNKNOWN),
+                f"Disque {device}: {label} (Usage: {usage}%), Erreur SMART - {reason}",
+                metrics, thresholds,
+            ))
+            continue
+        healthy = all(r['health'] == "OK" for r in reports)
+        health = "OK" if healthy else "Problème détecté"
+        disk_life = "; ".join(describe_disk_life(r) for r in reports)
+        metrics.update(
+            smart_passed=healthy,
+            physical_devices=partition['physical_devices'],
+            life_percent=[r['life_percent'] for r in reports],
+        )
+        results.append(CheckResult(
+            'disk', device, worst(space_status, Status.OK if healthy else Status.CRITICAL),
+            f"Disque {device}: {label}, Santé SMART: {health}, Usage: {usage}%, Durée de vie estimée: {disk_life}{space_hint(partition, space_status)}",
+            metrics, thresholds,
+        ))
+    return results
+
+def check_network(network):
+    """Vérifie l'accès réseau: au moins une cible doit répondre"""
+    probes = network['targets']
+    reachable = [name for name, stats in probes.items() if stats['received']]
+    status = Status.OK if reachable else Status.CRITICAL
+    label = "OK" if status is Status.OK else "Pas de connexion"
+    return [CheckResult(
+        'network', "Réseau", status,
+        f"Réseau: {label} ({len(reachable)}/{len(probes)} cibles joignables, pas de métrique de durée de vie)",
+        {'connected': bool(reachable), 'targets': probes},
+    )]
+
+def check_battery(battery):
+    """Vérifie l'état de la batterie, si présente"""
+    if not battery:
+        return []
+    status = grade(battery['percent'], 'battery_percent')
+    label = "OK" if status is Status.OK else "Batterie faible"
+    charging = "En charge" if battery['plugged'] else "Sur batterie"
+    cycles = battery['cycles'] or "N/A"
+    life_percent = "N/A"
+    metrics = {'percent': battery['percent'], 'plugged': battery['plugged']}
+    if battery['capacity_percent'] is not None:
+        metrics['capacity_percent'] = battery['capacity_percent']
+        life_percent = f"{battery['capacity_percent']:.1f}% capacité restante"
+    elif platform.system() == "Windows":
+        cycles = "Installez 'batteryinfo' via pip pour cycles (non supporté nativement)"
+    
+    return [CheckResult(
+        'battery', "Batterie", status,
+        f"Batterie: {label} ({battery['percent']}% - {charging}), Cycles: {cycles}, Durée de vie: {life_percent}",
+        metrics, {'battery_percent': THRESHOLDS['battery_percent']},
+    )]
+
+# Vérification planifiée: libellé, nom, fonction (synchrone ou coroutine), délai max (s),
+# exclusive (ne tourne jamais en même temps qu'une autre vérification exclusive), paramètres,
+# collecteurs dont les données sont passées en paramètres nommés
+ScheduledCheck = namedtuple('ScheduledCheck', 'label name func timeout exclusive kwargs needs', defaults=(False, {}, ()))
+
+SCAN_CHECKS = [
+    ScheduledCheck("Test du CPU...", 'cpu', check_cpu, 10, needs=('cpu', 'temperatures')),
+    ScheduledCheck("Test de la RAM...", 'memory', check_memory, 10, needs=('memory',)),
+    ScheduledCheck("Test des disques avec analyse SMART...", 'disk', check_disks, SMART_TIMEOUT + 15, needs=('disk', 'smart')),
+    ScheduledCheck("🔍 Test réseau...", 'network', check_network, 10, needs=('network',)),
+    ScheduledCheck("Test batterie...", 'battery', check_battery, 10, needs=('battery',)),
+]
+
+def register_check(check):
+    """Ajoute une vérification au scan (remplace celle de même nom)"""
+    missing = [name for name in check.needs if name not in COLLECTORS]
+    if missing:
+        raise ValueError(f"Collecteurs inconnus pour {check.name}: {', '.join(missing)}")
+    SCAN_CHECKS[:] = [c for c in SCAN_CHECKS if c.name != check.name] + [check]
+    return check
+
+def load_plugins(paths):
+    """Charge les greffons (fichiers .py ou dossiers): chacun expose register(diag), diag étant ce module"""
+    import importlib.util
+    module = sys.modules[__name__]
+    for path in paths:
+        files = sorted(os.path.join(path, name) for name in os.listdir(path) if name.endswith('.py')) if os.path.isdir(path) else [path]
+        for file in files:
+            name = f"outil_diag_plugin_{os.path.splitext(os.path.basename(file))[0]}"
+            try:
+                spec = importlib.util.spec_from_file_location(name, file)
+                plugin = importlib.util.module_from_spec(spec)
+                spec.loader.exec_module(plugin)
+                plugin.register(module)
+            except Exception as e:
+                print(f"{Colors.WARNING}Greffon {file} ignoré: {e}{Colors.ENDC}", file=sys.stderr)
+
+SCAN_DEADLINE = 60
+
+async def schedule_checks(checks, emit, progress=None, deadline=None, collection=None):
+    """Lance les vérifications en parallèle et transmet chaque résultat à `emit` dès qu'il arrive
+
+    Les fonctions synchrones tournent dans l'exécuteur de la boucle, les coroutines directement.
+    Les données des collecteurs déclarés dans `needs` sont obtenues via `collection` (CollectionRun).
+    Une vérification qui dépasse son délai, ou le délai global, produit un résultat d'état inconnu.
+    """
+    import asyncio
+    loop = asyncio.get_running_loop()
+    exclusive = asyncio.Lock()
+    collection = collection or CollectionRun()
+
+    async def execute(check):
+        kwargs = dict(check.kwargs)
+        if check.needs:
+            kwargs.update(zip(check.needs, await asyncio.gather(*(collection.get(name) for name in check.needs))))
+        func = PROFILER.probe(f'check.{check.name}')(check.func)
+        if asyncio.iscoroutinefunction(check.func):
+            return await func(**kwargs)
+        return await loop.run_in_executor(None, functools.partial(func, **kwargs))
+
+    def failed(check, reason):
+        emit(CheckResult(check.name, check.name, Status.UNKNOWN, f"{check.label.strip('.🔍 ')}: {reason}"))
+
+    async def run(check):
+        async with (exclusive if check.exclusive else contextlib.nullcontext()):
+            if progress:
+                progress(check.label)
+            try:
+                results = await asyncio.wait_for(execute(check), check.timeout)
+            except asyncio.TimeoutError:
+                failed(check, f"délai dépassé ({check.timeout}s)")
+                return
+            except Exception as e:
+                failed(check, f"erreur - {e}")
+                return
+        for result in results:
+            emit(result)
+
+    tasks = {asyncio.ensure_future(run(check)): check for check in checks}
+    _, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+        failed(tasks[task], f"délai global dépassé ({deadline}s)")
+    await asyncio.gather(*pending, return_exceptions=True)
+    # Les collectes sont protégées par shield(): personne d'autre ne les annule avant close()
+    await collection.close()
+
+def iter_checks(checks, progress=None, deadline=None, collection=None):
+    """Exécute schedule_checks dans un thread dédié et produit les résultats au fil de l'eau"""
+    import asyncio
+    import queue
+    from concurrent.futures import ThreadPoolExecutor
+    results = queue.Queue()
+    done = object()
+
+    def runner():
+        loop = asyncio.new_event_loop()
+        executor = ThreadPoolExecutor(max_workers=max(4, len(checks)), thread_name_prefix='check')
+        loop.set_default_executor(executor)
+        try:
+            loop.run_until_complete(schedule_checks(checks, results.put, progress, deadline, collection))
+            # Les transports des sous-processus terminés se ferment par rappels différés: on leur
+            # laisse un tour de boucle, sans quoi ils se finaliseraient sur une boucle déjà fermée
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(asyncio.sleep(0))
+        finally:
+            # close() n'attend pas l'exécuteur: une vérification bloquée ne retient pas le scan
+            loop.close()
+            results.put(done)
+
+    threading.Thread(target=runner, name='check-scheduler', daemon=True).start()
+    while True:
+        result = results.get()
+        if result is done:
+            return
+        yield result
+
+def iter_scan(progress=None, deadline=SCAN_DEADLINE, only=None, fresh=False, max_cost='expensive'):
+    """Exécute les vérifications du scan en parallèle et produit chaque résultat dès qu'il est prêt
+
+    `only` restreint le scan à certaines vérifications: seuls leurs collecteurs sont sollicités.
+    """
+    checks = [check for check in SCAN_CHECKS if not only or check.name in only]
+    yield from iter_checks(checks, progress, deadline, CollectionRun(fresh=fresh, max_cost=max_cost))
+
+def check_order(checks):
+    """Clé de tri qui range des résultats dans l'ordre de déclaration des vérifications"""
+    names = [check.name for check in checks]
+    return lambda result: names.index(result.check) if result.check in names else len(names)
+
+def scan_score(results):
+    """Score global du scan en pourcentage; les résultats d'état inconnu ne comptent pas"""
+    scores = [STATUS_SCORE[r.status] for r in results if r.status in STATUS_SCORE]
+    return sum(scores) / len(scores) if scores else 0
+
+def scan_components():
+    """Option 1: Scanner les composants et vérifier leur état avec estimation de durée de vie"""
+    clear_screen()
+    print(f"{Colors.BLUE}{'='*60}{Colors.ENDC}")
+    print(f"{Colors.BOLD}SCAN DES COMPOSANTS - DIAGNOSTIC AVANCÉ{Colors.ENDC}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.ENDC}\n")
+    
+    results = sorted(iter_scan(progress=print), key=check_order(SCAN_CHECKS))
+    
+    print(f"\n{Colors.GREEN}RÉSULTATS DU DIAGNOSTIC:{Colors.ENDC}")
+    print(f"{Colors.CYAN}{'─'*60}{Colors.ENDC}")
+    
+    for result in results:
+        print(f"{STATUS_COLOR[result.status]}{result.message}{Colors.ENDC}")
+    
+    score = scan_score(results)
+    
+    print(f"\n{Colors.CYAN}{'─'*60}{Colors.ENDC}")
+    if score >= 80:
+        print(f"{Colors.GREEN}SCORE GLOBAL: {score:.0f}% - Système en bonne santé!{Colors.ENDC}")
+    elif score >= 60:
+        print(f"{Colors.WARNING}SCORE GLOBAL: {score:.0f}% - Quelques points d'attention{Colors.ENDC}")
+    else:
+        print(f"{Colors.FAIL}SCORE GLOBAL: {score:.0f}% - Maintenance recommandée{Colors.ENDC}")
+    
+    input(f"\n{Colors.CYAN}Appuyez sur Entrée pour continuer...{Colors.ENDC}")
+
+# Résultat du parcours d'un dossier: son inode et sa date de modification, octets et nombre de ses
+# fichiers directs, sous-dossiers (nom, inode, mtime_ns) sur le même système de fichiers,
+# plus gros fichiers [(octets, chemin)]
+DirScan = namedtuple('DirScan', 'path ino mtime_ns bytes files subdirs top skipped errors cached')
+
+def _allocated(st):
+    """Espace réellement occupé (blocs alloués), comme du; taille apparente sans st_blocks"""
+    blocks = getattr(st, 'st_blocks', None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+class SpaceScanner:
+    """Parcours d'un dossier pour l'analyseur d'espace (appelé depuis les threads du pool)
+
+    Avec `cache_path`, le résultat d'un dossier est repris de la base SQLite tant que son inode
+    et sa date de modification n'ont pas changé (et dans la limite de `cache_ttl` secondes): seuls
+    ses sous-dossiers sont alors relus. Un fichier grossi sur place sans création ni suppression
+    dans son dossier n'est vu qu'à l'expiration de l'entrée.
+    """
+
+    def __init__(self, device, top, cache_path=None, cache_ttl=86400):
+        self.device = device
+        self.top = top
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+        self._local = threading.local()
+
+    def _db(self):
+        import sqlite3
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._local.db = sqlite3.connect(self.cache_path)
+        return db
+
+    def _dir_stat(self, path):
+        st = os.stat(path, follow_symlinks=False)
+        return st if st.st_dev == self.device else None
+
+    def _cached(self, path, ino, mtime_ns):
+        import json
+        row = self._db().execute(
+            'SELECT ino, mtime_ns, scanned, bytes, files, subdirs, top FROM dirs WHERE path = ?', (path,),
+        ).fetchone()
+        if row is None or row[:2] != (ino, mtime_ns) or time.time() - row[2] > self.cache_ttl:
+            return None
+        subdirs, skipped, errors = [], 0, 0
+        for name in json.loads(row[5]):
+            try:
+                st = self._dir_stat(os.path.join(path, name))
+            except OSError:
+                errors += 1
+                continue
+            if st is None:
+                skipped += 1
+            else:
+                subdirs.append((name, st.st_ino, st.st_mtime_ns))
+        top = [tuple(item) for item in json.loads(row[6])]
+        return DirScan(path, ino, mtime_ns, row[3], row[4], subdirs, top, skipped, errors, True)
+
+    def scan(self, path, ino, mtime_ns):
+        """Parcourt un dossier (ou reprend son résultat du cache)"""
+        if self.cache_path:
+            cached = self._cached(path, ino, mtime_ns)
+            if cached is not None:
+                return cached
+        total = files = skipped = errors = 0
+        subdirs, top = [], []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Sous Windows, DirEntry.stat() ne renseigne ni st_dev ni st_ino
+                            st = os.stat(entry.path, follow_symlinks=False) if os.name == 'nt' else entry.stat(follow_symlinks=False)
+                            if st.st_dev != self.device:
+                                skipped += 1
+                            else:
+                                total += _allocated(st)
+                                subdirs.append((entry.name, st.st_ino, st.st_mtime_ns))
+                            continue
+                        size = _allocated(entry.stat(follow_symlinks=False))
+                    except OSError:
+                        errors += 1
+                        continue
+                    total += size
+                    files += 1
+                    if len(top) < self.top:
+                        heapq.heappush(top, (size, entry.path))
+                    elif size > top[0][0]:
+                        heapq.heapreplace(top, (size, entry.path))
+        except OSError:
+            errors += 1
+        return DirScan(path, ino, mtime_ns, total, files, subdirs, top, skipped, errors, False)
+
+    def store(self, scans):
+        """Enregistre des résultats frais dans le cache, en une transaction"""
+        import json
+        now = time.time()
+        with self._db() as db:
+            db.executemany(
+                'INSERT OR REPLACE INTO dirs (path, ino, mtime_ns, scanned, bytes, files, subdirs, top) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [(scan.path, scan.ino, scan.mtime_ns, now, scan.bytes, scan.files,
+                  json.dumps([name for name, _, _ in scan.subdirs]), json.dumps(scan.top)) for scan in scans],
+            )
+
+    def open_cache(self):
+        if self.cache_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+            db = self._db()
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, ino INTEGER, mtime_ns INTEGER, scanned REAL,'
+                ' bytes INTEGER, files INTEGER, subdirs TEXT, top TEXT) WITHOUT ROWID'
+            )
+            db.commit()
+
+def analyse_space(root, workers=16, top=20, cache_path=None, cache_ttl=86400, progress=None, progress_every=0.5):
+    """Analyse l'occupation d'une arborescence sans quitter son système de fichiers
+
+    Les dossiers sont lus en parallèle (os.scandir dans un pool de threads, au plus 4 par thread
+    en vol). Seuls les totaux par dossier sont gardés (tableaux indexés, parent avant enfant);
+    les plus gros fichiers et dossiers passent par des tas bornés à `top` éléments. Comme `du -l`,
+    un fichier à plusieurs liens physiques est compté à chaque occurrence.
+    `progress` reçoit régulièrement un dict d'avancement.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    root = os.path.abspath(root)
+    st = os.stat(root)
+    scanner = SpaceScanner(st.st_dev, top, cache_path, cache_ttl)
+    scanner.open_cache()
+    paths = [root]
+    parents = array('q', [-1])
+    own = array('q', [0])
+    files_top = []
+    counts = {'dirs': 0, 'files': 0, 'bytes': 0, 'cached_dirs': 0, 'skipped_mounts': 0, 'errors': 0}
+    waiting = deque([(0, st.st_ino, st.st_mtime_ns)])
+    fresh = []
+    started = last_progress = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='space') as pool:
+        running = {}
+        while waiting or running:
+            while waiting and len(running) < 4 * workers:
+                index, ino, mtime_ns = waiting.popleft()
+                running[pool.submit(scanner.scan, paths[index], ino, mtime_ns)] = index
+            done, _ = wait(running, timeout=progress_every, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                scan = future.result()
+                own[index] = scan.bytes
+                counts['dirs'] += 1
+                counts['files'] += scan.files
+                counts['bytes'] += scan.bytes
+                counts['cached_dirs'] += scan.cached
+                counts['skipped_mounts'] += scan.skipped
+                counts['errors'] += scan.errors
+                for item in scan.top:
+                    if len(files_top) < top:
+                        heapq.heappush(files_top, item)
+                    elif item > files_top[0]:
+                        heapq.heapreplace(files_top, item)
+                for name, ino, mtime_ns in scan.subdirs:
+                    paths.append(os.path.join(scan.path, name))
+                    parents.append(index)
+                    own.append(0)
+                    waiting.append((len(paths) - 1, ino, mtime_ns))
+                if cache_path and not scan.cached:
+                    fresh.append(scan)
+            if len(fresh) >= 1000:
+                scanner.store(fresh)
+                fresh.clear()
+            now = time.monotonic()
+            if progress and now - last_progress >= progress_every:
+                last_progress = now
+                progress(dict(counts, pending=len(waiting) + len(running), elapsed=now - started))
+    if fresh:
+        scanner.store(fresh)
+    # Totaux récursifs: les enfants ont toujours un indice supérieur à leur parent
+    totals = array('q', own)
+    for index in range(len(paths) - 1, 0, -1):
+        totals[parents[index]] += totals[index]
+    children = [i for i in range(1, len(paths)) if parents[i] == 0]
+    return dict(
+        counts,
+        root=root,
+        elapsed=time.monotonic() - started,
+        total_bytes=totals[0],
+        children=[{'path': paths[i], 'bytes': totals[i]} for i in heapq.nlargest(top, children, key=totals.__getitem__)],
+        largest_dirs=[{'path': paths[i], 'bytes': own[i]} for i in heapq.nlargest(top, range(len(paths)), key=own.__getitem__)],
+        largest_files=[{'path': path, 'bytes': size} for size, path in sorted(files_top, reverse=True)],
+    )
+
+def format_size(value):
+    """Taille lisible (o, Ko, Mo, Go, To)"""
+    for unit in ('o', 'Ko', 'Mo', 'Go'):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}" if unit != 'o' else f"{value} {unit}"
+        value /= 1024
+    return f"{value:.1f} To"
+
+def get_windows_license():
+    """Option 2: Récupérer la clé de licence Windows"""
+    import subprocess
+    clear_screen()
+    print(f"{Colors.BLUE}{'='*60}{Colors.ENDC}")
+    print(f"{Colors.BOLD}RÉCUPÉRATION CLÉ DE LICENCE WINDOWS{Colors.ENDC}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.ENDC}\n")
+    
+    if platform.system() != "Windows":
+        print(f"{Colors.WARNING} Cette fonction n'est disponible que sur Windows!{Colors.ENDC}")
+        input(f"\n{Colors.CYAN}Appuyez sur Entrée pour continuer...{Colors.ENDC}")
+        return
+    
+    key = None
+    
+    try:
+        print(f"🔍 Recherche de la clé de licence (WMI)...")
+        cmd = 'wmic path softwarelicensingservice get OA3xOriginalProductKey'
+        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+        
+        if result.stdout:
+            lines = result.stdout.strip().split('\n')
+            for line in lines:
+                if line and not 'OA3xOriginalProductKey' in line:
+                    potential_key = line.strip()
+                    if potential_key and potential_key != '':
+                        key = potential_key
+                        print(f"\n{Colors.GREEN}✓  Clé trouvée (OEM via WMI):{Colors.ENDC}")
+                        print(f"{Colors.BOLD}{Colors.CYAN}{key}{Colors.ENDC}")
+                        break
+        
+        if not key:
+            print(f"Tentative alternative via PowerShell...")
+            ps_cmd = "(Get-WmiObject -query 'select * from SoftwareLicensingService').OA3xOriginalProductKey"
+            result2 = subprocess.run(['powershell', '-Command', ps_cmd], capture_output=True, text=True)
+            
+            potential_key = result2.stdout.strip()
+            if potential_key:
+                key = potential_key
+                print(f"\n{Colors.GREEN}Clé trouvée (OEM via PowerShell):{Colors.ENDC}")
+                print(f"{Colors.BOLD}{Colors.CYAN}{key}{Colors.ENDC}")
+        
+        if not key:
+            print(f"Tentative via Registry...")
+            import winreg
+            reg_path = r"SOFTWARE\Microsoft\Windows NT\CurrentVersion\SoftwareProtectionPlatform"
+            aReg = winreg.ConnectRegistry(None, winreg.HKEY_LOCAL_MACHINE)
+            aKey = winreg.OpenKey(aReg, reg_path)
+            key = winreg.QueryValueEx(aKey, "BackupProductKeyDefault")[0]
+            print(f"\n{Colors.GREEN}Clé trouvée (Registry):{Colors.ENDC}")
+            print(f"{Colors.BOLD}{Colors.CYAN}{key}{Colors.ENDC}")
+        
+        if key:
+            save_to_file = input(f"\nVoulez-vous sauvegarder la clé dans un fichier? (o/n): ")
+            if save_to_file.lower() == 'o':
+                filename = f"windows_key_{socket.gethostname()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
+                with open(filename, 'w') as f:
+                    f.write(f"Hostname: {socket.gethostname()}\n")
+                    f.write(f"Date: {datetime.now()}\n")
+                    f.write(f"OS: {platform.system()} {platform.release()}\n")
+                    f.write(f"Clé Windows: {key}\n")
+                print(f"{Colors.GREEN}Clé sauvegardée dans: {filename}{Colors.ENDC}")
+        else:
+            print(f"{Colors.WARNING}⚠️ Aucune clé trouvée.{Colors.ENDC}")
+            print(f"Cela peut arriver si Windows a été installé avec une clé retail ou volume.")
+            
+    except Exception as e:
+        print(f"{Colors.FAIL}Erreur lors de la récupération: {e}{Colors.ENDC}")
+        print(f"Assurez-vous d'exécuter le script en tant qu'administrateur.")
+    
+    input(f"\n{Colors.CYAN}Appuyez sur Entrée pour continuer...{Colors.ENDC}")
+
+_COMPRESS_DATA = None
+
+def _work_int(n):
+    acc = 0
+    for i in range(n):
+        acc = (acc + i * i) ^ (i >> 3)
+    return acc
+
+def _work_float(n):
+    return math.fsum(map(math.sqrt, range(n))) + math.fsum(map(math.sin, range(n)))
+
+def _work_hash(n):
+    import hashlib
+    data = bytes(range(256)) * 4096
+    for _ in range(n):
+        hashlib.sha256(data).digest()
+
+def _work_compress(n):
+    global _COMPRESS_DATA
+    import random
+    import zlib
+    if _COMPRESS_DATA is None:
+        rng = random.Random(0)
+        _COMPRESS_DATA = ''.join(rng.choices('abcdefgh  \n', k=256 * 1024)).encode()
+    for _ in range(n):
+        zlib.compress(_COMPRESS_DATA, 6)
+
+# Charges CPU: fonction, opérations par exécution, opérations/s d'un cœur de référence (score 1000)
+CPU_WORKLOADS = {
+    'int': (_work_int, 500_000, 5_000_000),
+    'float': (_work_float, 400_000, 4_000_000),
+    'hash': (_work_hash, 100, 1_000),
+    'compress': (_work_compress, 3, 25),
+}
+
+def _timed_workload(name):
+    """Exécute une fois une charge et retourne sa durée en nanosecondes"""
+    func, ops, _ = CPU_WORKLOADS[name]
+    start = time.perf_counter_ns()
+    func(ops)
+    return time.perf_counter_ns() - start
+
+def _trial_stats(rates):
+    import statistics
+    return {
+        'median': statistics.median(rates),
+        'stdev': statistics.stdev(rates) if len(rates) > 1 else 0.0,
+        'trials': len(rates),
+    }
+
+def _geometric_score(rates):
+    """Score composite: moyenne géométrique des débits relatifs à la référence, x1000"""
+    logs = [math.log(rates[name] / CPU_WORKLOADS[name][2]) for name in rates]
+    return 1000 * math.exp(sum(logs) / len(logs))
+
+def _pool_trials(pool, name, workers, trials, warmup):
+    """Débits (opérations/s) de `trials` exécutions simultanées d'une charge sur `workers` processus
+
+    Chaque essai est chronométré dans les processus eux-mêmes, sans la transmission par le pool:
+    le débit d'ensemble est rapporté à la durée du processus le plus lent.
+    """
+    ops = CPU_WORKLOADS[name][1]
+    for _ in range(warmup):
+        list(pool.map(_timed_workload, [name] * workers))
+    rates = []
+    for _ in range(trials):
+        slowest = max(pool.map(_timed_workload, [name] * workers))
+        rates.append(workers * ops / (slowest / 1e9))
+    return _trial_stats(rates)
+
+def cpu_benchmark(trials=5, warmup=1, workers=None):
+    """Benchmark CPU mono-cœur puis tous cœurs sur plusieurs charges
+
+    Les mesures tournent dans des processus dédiés (à l'abri des threads de l'outil). Chacune est
+    précédée de `warmup` exécutions non comptées puis répétée `trials` fois; on retient la médiane
+    des débits (opérations/s) et leur écart-type.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    workers = workers or psutil.cpu_count(logical=True) or 1
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        single = {name: _pool_trials(pool, name, 1, trials, warmup) for name in CPU_WORKLOADS}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        multi = {name: _pool_trials(pool, name, workers, trials, warmup) for name in CPU_WORKLOADS}
+
+    single_score = _geometric_score({name: s['median'] for name, s in single.items()})
+    multi_score = _geometric_score({name: s['median'] for name, s in multi.items()})
+    return {
+        'workers': workers,
+        'single_core': single,
+        'all_core': multi,
+        'single_core_score': single_score,
+        'all_core_score': multi_score,
+        'scaling_efficiency': multi_score / (single_score * workers),
+    }
+
+def bench_cpu(trials=5, warmup=1, workers=None):
+    """Benchmark CPU (voir cpu_benchmark) converti en résultats"""
+    result = cpu_benchmark(trials, warmup, workers)
+    single_spread = max(s['stdev'] / s['median'] for s in result['single_core'].values()) * 100
+    return [
+        CheckResult(
+            'cpu_benchmark', "CPU", grade(result['single_core_score'], 'cpu_single_core_score'),
+            f"Score mono-cœur {result['single_core_score']:.0f} (médiane de {trials} essais, dispersion max {single_spread:.1f}%)",
+            {'score': result['single_core_score'], 'workloads': result['single_core']},
+            {'cpu_single_core_score': THRESHOLDS['cpu_single_core_score']},
+        ),
+        CheckResult(
+            'cpu_multicore', "CPU", grade(result['all_core_score'], 'cpu_all_core_score'),
+            f"Score multi-cœurs {result['all_core_score']:.0f} sur {result['workers']} processus, efficacité {result['scaling_efficiency'] * 100:.0f}%",
+            {
+                'score': result['all_core_score'],
+                'workers': result['workers'],
+                'scaling_efficiency': result['scaling_efficiency'],
+                'workloads': result['all_core'],
+            },
+            {'cpu_all_core_score': THRESHOLDS['cpu_all_core_score']},
+        ),
+    ]
+
+# Tailles de travail du benchmark mémoire: None = taille DRAM choisie à l'exécution
+MEMORY_WORKING_SETS = (('L1', 16 * 1024), ('L2', 256 * 1024), ('L3', 4 * 1024 ** 2), ('DRAM', None))
+MEMORY_LATENCY_MAX = 64 * 1024 ** 2
+CACHE_LINE = 64
+
+def _best_rate(op, traffic, min_time, trials=3):
+    """Meilleur débit (octets/s) d'une opération répétée pendant au moins `min_time` secondes"""
+    batch = max(1, (1024 ** 2) // traffic)
+    best = math.inf
+    for _ in range(trials):
+        count = 0
+        start = time.perf_counter()
+        while True:
+            for _ in range(batch):
+                op()
+            count += batch
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        best = min(best, elapsed / count)
+    return traffic / best
+
+def _memory_bandwidth(size, min_time):
+    """Débits copy (memoryview), et scale/add si NumPy est disponible, pour une taille de travail"""
+    src = bytearray(os.urandom(4096)) * (size // 4096 or 1)
+    src = memoryview(src)[:size]
+    dst = memoryview(bytearray(size))
+    dst[:] = src
+
+    def copy():
+        dst[:] = src
+
+    # Convention STREAM: copy et scale déplacent 2 tampons, add en déplace 3
+    rates = {'copy_gb_per_s': _best_rate(copy, 2 * size, min_time) / 1e9}
+    try:
+        import numpy
+    except ImportError:
+        return rates
+    a, b, c = (numpy.ones(max(size // 8, 1)) for _ in range(3))
+    rates['scale_gb_per_s'] = _best_rate(lambda: numpy.multiply(b, 3.0, out=a), 2 * a.nbytes, min_time) / 1e9
+    rates['add_gb_per_s'] = _best_rate(lambda: numpy.add(b, c, out=a), 3 * a.nbytes, min_time) / 1e9
+    return rates
+
+def _pointer_chase(size, loads=1 << 20):
+    """Temps moyen (ns) d'un chargement dépendant dans une chaîne aléatoire d'une ligne de cache par nœud"""
+    import random
+    stride = CACHE_LINE // 8
+    nodes = max(size // CACHE_LINE, 2)
+    order = list(range(nodes))
+    random.Random(0).shuffle(order)
+    chain = array('q', bytes(8 * stride * nodes))
+    for current, following in zip(order, order[1:] + order[:1]):
+        chain[current * stride] = following * stride
+    del order
+    i = 0
+    rounds = max(loads // 8, 1)
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        # Huit chargements par tour pour réduire le coût de la boucle
+        i = chain[chain[chain[chain[chain[chain[chain[chain[i]]]]]]]]
+    return (time.perf_counter_ns() - start) / (rounds * 8)
+
+def _memory_single(dram_size, min_time):
+    """Partie mono-processus du benchmark mémoire (exécutée dans un processus dédié)"""
+    import importlib.util
+    has_numpy = importlib.util.find_spec('numpy') is not None
+    sizes = {label: size or dram_size for label, size in MEMORY_WORKING_SETS}
+    bandwidth = {label: dict(bytes=size, **_memory_bandwidth(size, min_time)) for label, size in sizes.items()}
+    l1_ns = _pointer_chase(sizes['L1'])
+    dram_ns = _pointer_chase(min(dram_size, MEMORY_LATENCY_MAX))
+    return {'numpy': has_numpy, 'sizes': bandwidth, 'l1_ns': l1_ns, 'ns': dram_ns}
+
+def _memory_copy_rate(size, min_time):
+    """Débit copy (octets/s) d'un processus parmi plusieurs, à la taille DRAM"""
+    return _memory_bandwidth(size, min_time)['copy_gb_per_s']
+
+def memory_benchmark(size_mb=128, workers=None, min_time=0.2):
+    """Benchmark mémoire: bande passante du cache L1 jusqu'à la DRAM, latence et débit multi-processus
+
+    La latence est celle d'une chaîne de pointeurs aléatoire (une ligne de cache par nœud); le coût de
+    l'interpréteur est estimé par la même chaîne tenant dans L1 et retranché. `workers` processus
+    copient simultanément chacun `size_mb` Mo (0 pour ne pas lancer cette partie).
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    size = size_mb * 1024 ** 2
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        result = pool.submit(_memory_single, size, min_time).result()
+    result['dram_copy_gb_per_s'] = result['sizes']['DRAM']['copy_gb_per_s']
+    result['excess_ns'] = max(result['ns'] - result['l1_ns'], 0.0)
+    if workers is None:
+        workers = psutil.cpu_count(logical=False) or 1
+    # Deux tampons par processus, sans dépasser le quart de la mémoire disponible
+    workers = min(workers, max(psutil.virtual_memory().available // (8 * size), 1))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_memory_copy_rate, [CACHE_LINE] * workers, [0.01] * workers))
+            rates = list(pool.map(_memory_copy_rate, [size] * workers, [min_time * 2] * workers))
+        result['multi'] = {'workers': workers, 'copy_gb_per_s': sum(rates)}
+    return result
+
+def bench_memory(size_mb=128, workers=None):
+    """Benchmark mémoire (voir memory_benchmark) converti en résultats"""
+    result = memory_benchmark(size_mb, workers)
+    multi = result.get('multi')
+    copy_rate = multi['copy_gb_per_s'] if multi else result['dram_copy_gb_per_s']
+    caches = ", ".join(f"{label} {row['copy_gb_per_s']:.1f}" for label, row in result['sizes'].items())
+    multi_text = f", {multi['copy_gb_per_s']:.1f} GB/s sur {multi['workers']} processus" if multi else ""
+    metrics = {'sizes': result['sizes'], 'dram_copy_gb_per_s': result['dram_copy_gb_per_s'], 'numpy': result['numpy']}
+    if multi:
+        metrics['multi'] = multi
+    return [
+        CheckResult(
+            'memory_bandwidth', "RAM", grade(copy_rate, 'memory_copy_gb_per_s'),
+            f"Bande passante mémoire (copie): {result['dram_copy_gb_per_s']:.1f} GB/s en DRAM{multi_text} (GB/s par niveau: {caches})",
+            metrics,
+            {'memory_copy_gb_per_s': THRESHOLDS['memory_copy_gb_per_s']},
+        ),
+        CheckResult(
+            'memory_latency', "RAM", grade(result['excess_ns'], 'memory_latency_ns'),
+            f"Latence mémoire: {result['excess_ns']:.0f} ns au-delà de L1 ({result['ns']:.0f} ns par accès dépendant, {result['l1_ns']:.0f} ns en L1)",
+            {'ns': result['excess_ns'], 'raw_ns': result['ns'], 'l1_ns': result['l1_ns']},
+            {'memory_latency_ns': THRESHOLDS['memory_latency_ns']},
+        ),
+    ]
+
+DISK_BENCH_FILE = "test_speed.tmp"
+DISK_BENCH_BLOCK = 1024 * 1024
+DISK_BENCH_RANDOM_BLOCK = 4096
+
+def _aligned_buffer(size):
+    """Tampon anonyme aligné sur la page, utilisable avec O_DIRECT"""
+    import mmap
+    return mmap.mmap(-1, size)
+
+def _open_bench_file(path, flags, direct):
+    """Ouvre le fichier de test, en O_DIRECT si demandé et supporté; retourne (fd, direct effectif)"""
+    flags |= getattr(os, 'O_BINARY', 0)
+    if direct and hasattr(os, 'O_DIRECT'):
+        try:
+            return os.open(path, flags | os.O_DIRECT, 0o600), True
+        except OSError:
+            pass
+    return os.open(path, flags, 0o600), False
+
+def _read_at(fd, buf, offset):
+    if hasattr(os, 'preadv'):
+        return os.preadv(fd, [buf], offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return len(os.read(fd, len(buf)))
+
+def _write_at(fd, buf, offset):
+    if hasattr(os, 'pwritev'):
+        return os.pwritev(fd, [buf], offset)
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.write(fd, buf)
+
+def _drop_file_cache(path):
+    """Évince le fichier du cache de pages (Linux); retourne False si impossible"""
+    if not hasattr(os, 'posix_fadvise'):
+        return False
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+def _phase_stats(latencies_ns, total_bytes, elapsed):
+    """Débit, IOPS et percentiles de latence (µs) d'une phase"""
+    lat = sorted(latencies_ns)
+    elapsed = max(elapsed, 1e-9)
+
+    def pct(p):
+        return lat[min(len(lat) - 1, int(p / 100 * len(lat)))] / 1000 if lat else None
+
+    return {
+        'ops': len(lat),
+        'seconds': elapsed,
+        'mb_per_s': total_bytes / (1024 ** 2) / elapsed,
+        'iops': len(lat) / elapsed,
+        'lat_us': {'p50': pct(50), 'p95': pct(95), 'p99': pct(99), 'max': lat[-1] / 1000 if lat else None},
+    }
+
+def _random_worker(path, write, direct, offsets, block):
+    """Exécute une file d'E/S aléatoires sur son propre descripteur"""
+    fd, _ = _open_bench_file(path, os.O_RDWR if write else os.O_RDONLY, direct)
+    buf = _aligned_buffer(block)
+    if write:
+        buf.write(os.urandom(block))
+    latencies = array('d')
+    try:
+        for offset in offsets:
+            start = time.perf_counter_ns()
+            if write:
+                _write_at(fd, buf, offset)
+            else:
+                _read_at(fd, buf, offset)
+            latencies.append(time.perf_counter_ns() - start)
+        if write:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+        buf.close()
+    return latencies
+
+def disk_benchmark(directory=None, size_mb=64, direct=False, drop_cache=True, queue_depths=(1, 4, 16), random_ops=4096, seed=0):
+    """Benchmark disque: séquentiel, aléatoire 4K à plusieurs profondeurs de file et lecture mmap
+
+    Les écritures sont suivies d'un fsync compté dans le temps de la phase. Avant chaque lecture,
+    le fichier est évincé du cache de pages (ou lu en O_DIRECT) pour mesurer le disque et non la RAM.
+    """
+    import mmap
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+    path = os.path.join(directory or os.getcwd(), DISK_BENCH_FILE)
+    block = DISK_BENCH_BLOCK
+    blocks = max(1, size_mb * 1024 * 1024 // block)
+    size = blocks * block
+    rng = random.Random(seed)
+    result = {'path': path, 'size_mb': size // (1024 ** 2), 'direct': False, 'cache_dropped': False, 'phases': {}}
+    phases = result['phases']
+
+    def before_read():
+        if drop_cache and not result['direct']:
+            result['cache_dropped'] = _drop_file_cache(path)
+
+    buf = _aligned_buffer(block)
+    buf.write(os.urandom(block))
+    try:
+        fd, result['direct'] = _open_bench_file(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, direct)
+        latencies = array('d')
+        start = time.perf_counter_ns()
+        try:
+            for i in range(blocks):
+                t0 = time.perf_counter_ns()
+                _write_at(fd, buf, i * block)
+                latencies.append(time.perf_counter_ns() - t0)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        phases['seq_write'] = _phase_stats(latencies, size, (time.perf_counter_ns() - start) / 1e9)
+
+        before_read()
+        fd, _ = _open_bench_file(path, os.O_RDONLY, result['direct'])
+        latencies = array('d')
+        start = time.perf_counter_ns()
+        try:
+            for i in range(blocks):
+                t0 = time.perf_counter_ns()
+                _read_at(fd, buf, i * block)
+                latencies.append(time.perf_counter_ns() - t0)
+        finally:
+            os.close(fd)
+        phases['seq_read'] = _phase_stats(latencies, size, (time.perf_counter_ns() - start) / 1e9)
+
+        before_read()
+        latencies = array('d')
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            src, dst = memoryview(mapped), memoryview(buf)
+            start = time.perf_counter_ns()
+            try:
+                for i in range(blocks):
+                    t0 = time.perf_counter_ns()
+                    dst[:] = src[i * block:(i + 1) * block]
+                    latencies.append(time.perf_counter_ns() - t0)
+            finally:
+                elapsed = (time.perf_counter_ns() - start) / 1e9
+                src.release()
+                dst.release()
+                mapped.close()
+        phases['mmap_read'] = _phase_stats(latencies, size, elapsed)
+
+        slots = size // DISK_BENCH_RANDOM_BLOCK
+        for write in (False, True):
+            for qd in queue_depths:
+                if not write:
+                    before_read()
+                offsets = [rng.randrange(slots) * DISK_BENCH_RANDOM_BLOCK for _ in range(random_ops)]
+                start = time.perf_counter_ns()
+                with ThreadPoolExecutor(max_workers=qd) as pool:
+                    futures = [
+                        pool.submit(_random_worker, path, write, result['direct'], offsets[i::qd], DISK_BENCH_RANDOM_BLOCK)
+                        for i in range(qd)
+                    ]
+                    latencies = [lat for future in futures for lat in future.result()]
+                elapsed = (time.perf_counter_ns() - start) / 1e9
+                name = f"rand_{'write' if write else 'read'}_qd{qd}"
+                phases[name] = _phase_stats(latencies, len(latencies) * DISK_BENCH_RANDOM_BLOCK, elapsed)
+    finally:
+        buf.close()
+        if os.path.exists(path):
+            os.remove(path)
+    return result
+
+def bench_disk(directory=None, size_mb=64, direct=False, drop_cache=True, queue_depths=(1, 4, 16)):
+    """Benchmark disque (voir disk_benchmark) converti en résultats"""
+    result = disk_benchmark(directory, size_mb, direct, drop_cache, queue_depths)
+    phases = result['phases']
+    options = {'path': result['path'], 'size_mb': result['size_mb'], 'direct': result['direct'], 'cache_dropped': result['cache_dropped']}
+
+    def lat_text(phase):
+        return f"p50 {phase['lat_us']['p50']:.0f} µs, p99 {phase['lat_us']['p99']:.0f} µs"
+
+    results = []
+    for check, phase_name, threshold in (
+        ('disk_write', 'seq_write', 'disk_write_mb_per_s'),
+        ('disk_read', 'seq_read', None),
+        ('disk_mmap_read', 'mmap_read', None),
+    ):
+        phase = phases[phase_name]
+        results.append(CheckResult(
+            check, "Disque", grade(phase['mb_per_s'], threshold) if threshold else Status.OK,
+            f"{phase['mb_per_s']:.2f} MB/s",
+            dict(options, **phase), {threshold: THRESHOLDS[threshold]} if threshold else {},
+        ))
+    for check, prefix, threshold in (
+        ('disk_rand_read', 'rand_read', 'disk_rand_read_iops'),
+        ('disk_rand_write', 'rand_write', None),
+    ):
+        by_qd = {qd: phases[f"{prefix}_qd{qd}"] for qd in queue_depths}
+        best_qd = max(by_qd, key=lambda qd: by_qd[qd]['iops'])
+        best = by_qd[best_qd]
+        results.append(CheckResult(
+            check, "Disque", grade(best['iops'], threshold) if threshold else Status.OK,
+            f"{best['iops']:.0f} IOPS 4K (QD{best_qd}, {lat_text(by_qd[min(by_qd)])} à QD{min(by_qd)})",
+            dict(options, iops=best['iops'], queue_depth=best_qd, by_queue_depth=by_qd),
+            {threshold: THRESHOLDS[threshold]} if threshold else {},
+        ))
+    return results
+
+async def bench_network(targets=None, count=20, interval=0.05, timeout=1.0):
+    """Mesure latence, gigue et perte vers les cibles configurées; la meilleure cible fait foi"""
+    probes = await network_probe(targets or network_targets(), count, interval, timeout)
+    reachable = {name: stats for name, stats in probes.items() if stats['avg_ms'] is not None}
+    if not reachable:
+        return [CheckResult('network_latency', "Réseau", Status.UNKNOWN, "N/A", {'ms': None, 'targets': probes})]
+    best = min(reachable, key=lambda name: reachable[name]['avg_ms'])
+    latency_ms = reachable[best]['avg_ms']
+    return [CheckResult(
+        'network_latency', "Réseau", grade(latency_ms, 'network_latency_ms'),
+        f"{format_probe(reachable[best])} vers {best}",
+        {'ms': latency_ms, 'target': best, 'targets': probes},
+        {'network_latency_ms': THRESHOLDS['network_latency_ms']},
+    )]
+
+# Compteurs disponibles pour le classement des processus
+PROCESS_COUNTERS = ('cpu_percent', 'memory_percent', 'rss', 'io_bytes', 'num_fds', 'num_threads')
+PROCESS_GROUPS = ('username', 'cgroup')
+
+def read_cgroup(pid):
+    """Chemin du cgroup d'un processus (Linux), None ailleurs"""
+    try:
+        with open(f'/proc/{pid}/cgroup') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    for line in lines:
+        if line.startswith('0::'):
+            return line[3:] or '/'
+    for line in lines:
+        parts = line.split(':', 2)
+        if len(parts) == 3 and 'cpu' in parts[1].split(','):
+            return parts[2]
+    return lines[0].split(':', 2)[-1] if lines else None
+
+def _denied_as_none(func):
+    try:
+        return func()
+    except (psutil.AccessDenied, NotImplementedError, AttributeError):
+        return None
+
+class ProcessTable:
+    """Analyse des processus en une seule passe de process_iter
+
+    Les informations statiques (nom, utilisateur, cgroup) sont gardées par PID et date de création:
+    un relevé suivant ne relit que les compteurs demandés.
+    """
+
+    def __init__(self):
+        self._static = {}
+
+    def _static_info(self, proc, with_cgroup):
+        key = (proc.pid, proc.create_time())
+        entry = self._static.get(key)
+        if entry is None:
+            entry = {
+                'name': _denied_as_none(proc.name) or '',
+                'username': _denied_as_none(proc.username),
+            }
+            self._static[key] = entry
+        if with_cgroup and 'cgroup' not in entry:
+            entry['cgroup'] = read_cgroup(proc.pid)
+        return key, entry
+
+    def rows(self, counters=('cpu_percent', 'memory_percent'), with_cgroup=False):
+        """Produit une ligne par processus avec les compteurs demandés (None si accès refusé)"""
+        unknown = set(counters) - set(PROCESS_COUNTERS)
+        if unknown:
+            raise ValueError(f"Compteurs inconnus: {', '.join(sorted(unknown))}")
+        total_mem = psutil.virtual_memory().total
+        sampler = get_sampler() if 'cpu_percent' in counters else None
+        need_mem = 'rss' in counters or 'memory_percent' in counters
+        seen = set()
+        for proc in psutil.process_iter():
+            try:
+                with proc.oneshot():
+                    key, static = self._static_info(proc, with_cgroup)
+                    row = {'pid': proc.pid}
+                    row.update(static)
+                    mem = _denied_as_none(proc.memory_info) if need_mem else None
+                    if 'cpu_percent' in counters:
+                        row['cpu_percent'] = sampler.process_cpu_percent(proc.pid)
+                    if 'memory_percent' in counters:
+                        row['memory_percent'] = mem.rss / total_mem * 100 if mem else None
+                    if 'rss' in counters:
+                        row['rss'] = mem.rss if mem else None
+                    if 'io_bytes' in counters:
+                        io = _denied_as_none(proc.io_counters)
+                        row['io_bytes'] = io.read_bytes + io.write_bytes if io else None
+                    if 'num_fds' in counters:
+                        row['num_fds'] = _denied_as_none(proc.num_fds if os.name != 'nt' else proc.num_handles)
+                    if 'num_threads' in counters:
+                        row['num_threads'] = _denied_as_none(proc.num_threads)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                continue
+            seen.add(key)
+            yield row
+        self._static = {key: value for key, value in self._static.items() if key in seen}
+
+    def top(self, n=5, keys=('cpu_percent', 'memory_percent'), counters=()):
+        """Les n premiers processus pour chaque clé, par tas bornés (sans trier la liste complète)"""
+        heaps = {key: [] for key in keys}
+        order = itertools.count()
+        total = 0
+        for row in self.rows(tuple(dict.fromkeys(tuple(keys) + tuple(counters)))):
+            total += 1
+            for key in keys:
+                item = (row[key] or 0, next(order), row)
+                heap = heaps[key]
+                if len(heap) < n:
+                    heapq.heappush(heap, item)
+                elif item[0] > heap[0][0]:
+                    heapq.heapreplace(heap, item)
+        return total, {key: [row for _, _, row in sorted(heap, reverse=True)] for key, heap in heaps.items()}
+
+    def aggregate(self, by='username', counters=('cpu_percent', 'rss', 'num_threads')):
+        """Somme des compteurs par utilisateur ou par cgroup, groupes triés par le premier compteur"""
+        if by not in PROCESS_GROUPS:
+            raise ValueError(f"Regroupement inconnu: {by}")
+        groups = {}
+        for row in self.rows(counters, with_cgroup=(by == 'cgroup')):
+            group = groups.setdefault(row[by] or "N/A", dict({'group': row[by] or "N/A", 'processes': 0}, **dict.fromkeys(counters, 0)))
+            group['processes'] += 1
+            for counter in counters:
+                group[counter] += row[counter] or 0
+        return sorted(groups.values(), key=lambda g: g[counters[0]] if counters else g['processes'], reverse=True)
+
+_process_table = None
+
+def get_process_table():
+    """Retourne la table des processus partagée"""
+    global _process_table
+    if _process_table is None:
+        _process_table = ProcessTable()
+    return _process_table
+
+def bench_processes():
+    """Top 5 des processus par CPU et par RAM"""
+    sampler = get_sampler()
+    sampler.wait_processes(sampler.proc_interval + sampler.interval * 2)
+    total, top = get_process_table().top(5, ('cpu_percent', 'memory_percent'))
+    return [CheckResult(
+        'processes', "Processus", Status.OK, f"{total} processus analysés",
+        {'top_cpu_processes': top['cpu_percent'], 'top_mem_processes': top['memory_percent']},
+    )]
+
+# Les benchmarks CPU, mémoire et disque sont exclusifs entre eux pour ne pas fausser leurs mesures;
+# la latence réseau et l'analyse des processus tournent en parallèle
+BENCH_CHECKS = [
+    ScheduledCheck("Test de performance CPU...", 'cpu', bench_cpu, 300, True),
+    ScheduledCheck("Test de bande passante mémoire...", 'memory', bench_memory, 300, True),
+    ScheduledCheck("Test de vitesse disque...", 'disk', bench_disk, 600, True),
+    ScheduledCheck("Test de latence réseau...", 'network', bench_network, 30),
+    ScheduledCheck("Analyse des processus...", 'processes', bench_processes, 60),
+]
+BENCH_DEADLINE = 900
+
+def iter_bench(progress=None, options=None, deadline=BENCH_DEADLINE):
+    """Exécute les benchmarks et produit chaque résultat dès qu'il est prêt
+
+    `options` associe le nom d'un benchmark ('disk', ...) à ses paramètres.
+    """
+    options = options or {}
+    checks = [check._replace(kwargs=options.get(check.name, {})) for check in BENCH_CHECKS]
+    yield from iter_checks(checks, progress, deadline)
+
+# Points attribués par benchmark selon son état
+BENCH_POINTS = {
+    'cpu_benchmark': {Status.OK: 15, Status.WARNING: 9, Status.CRITICAL: 4},
+    'cpu_multicore': {Status.OK: 10, Status.WARNING: 6, Status.CRITICAL: 3},
+    'memory_bandwidth': {Status.OK: 10, Status.WARNING: 6, Status.CRITICAL: 3},
+    'memory_latency': {Status.OK: 5, Status.WARNING: 3, Status.CRITICAL: 1},
+    'disk_write': {Status.OK: 20, Status.WARNING: 12, Status.CRITICAL: 5},
+    'disk_rand_read': {Status.OK: 15, Status.WARNING: 8, Status.CRITICAL: 5},
+    'network_latency': {Status.OK: 25, Status.WARNING: 17, Status.CRITICAL: 8, Status.UNKNOWN: 12},
+}
+
+def performance_score(results):
+    """Score de performance sur 100 à partir des résultats des benchmarks"""
+    return sum(BENCH_POINTS[r.check][r.status] for r in results if r.check in BENCH_POINTS)
+
+REPORT_KEYS = ('cpu_benchmark', 'cpu_multicore', 'memory_bandwidth', 'memory_latency', 'disk_write', 'disk_read', 'disk_mmap_read', 'disk_rand_read', 'disk_rand_write', 'network_latency')
+
+def build_report(results):
+    """Construit le rapport complet sérialisable en JSON"""
+    by_check = {r.check: r for r in results}
+    report = {key: by_check[key].message for key in REPORT_KEYS if key in by_check}
+    processes = by_check['processes'].metrics if 'processes' in by_check else {}
+    return {
+        'hostname': socket.gethostname(),
+        'date': str(datetime.now()),
+        'system': platform.system(),
+        'performance': report,
+        'score': performance_score(results),
+        'metrics': bench_metrics(results),
+        'top_cpu_processes': processes.get('top_cpu_processes', []),
+        'top_mem_processes': processes.get('top_mem_processes', []),
+    }
+
+def save_report(full_report, filename=None):
+    """Écrit le rapport JSON et retourne le nom du fichier"""
+    import json
+    if filename is None:
+        filename = f"performance_report_{socket.gethostname()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filename, 'w') as f:
+        json.dump(full_report, f, indent=2, default=str)
+    return filename
+
+# Métriques numériques d'un rapport: nom, vérification, chemin dans ses métriques, sens (+1 plus haut = mieux)
+BENCH_METRICS = [
+    ('cpu_single_core_score', 'cpu_benchmark', ('score',), 1),
+    ('cpu_all_core_score', 'cpu_multicore', ('score',), 1),
+    ('cpu_scaling_efficiency', 'cpu_multicore', ('scaling_efficiency',), 1),
+    ('memory_l1_copy_gb_per_s', 'memory_bandwidth', ('sizes', 'L1', 'copy_gb_per_s'), 1),
+    ('memory_dram_copy_gb_per_s', 'memory_bandwidth', ('dram_copy_gb_per_s',), 1),
+    ('memory_dram_add_gb_per_s', 'memory_bandwidth', ('sizes', 'DRAM', 'add_gb_per_s'), 1),
+    ('memory_multi_copy_gb_per_s', 'memory_bandwidth', ('multi', 'copy_gb_per_s'), 1),
+    ('memory_latency_ns', 'memory_latency', ('ns',), -1),
+    ('disk_write_mb_per_s', 'disk_write', ('mb_per_s',), 1),
+    ('disk_write_p99_us', 'disk_write', ('lat_us', 'p99'), -1),
+    ('disk_read_mb_per_s', 'disk_read', ('mb_per_s',), 1),
+    ('disk_mmap_read_mb_per_s', 'disk_mmap_read', ('mb_per_s',), 1),
+    ('disk_rand_read_iops', 'disk_rand_read', ('iops',), 1),
+    ('disk_rand_write_iops', 'disk_rand_write', ('iops',), 1),
+    ('network_latency_ms', 'network_latency', ('ms',), -1),
+]
+METRIC_DIRECTION = dict({name: direction for name, _, _, direction in BENCH_METRICS}, score=1, cpu_benchmark_seconds=-1)
+
+def bench_metrics(results):
+    """Valeurs numériques des benchmarks, à plat (voir BENCH_METRICS)"""
+    by_check = {r.check: r.metrics for r in results}
+    metrics = {}
+    for name, check, path, _ in BENCH_METRICS:
+        value = by_check.get(check)
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        value = _finite_number(value)
+        if value is not None:
+            metrics[name] = value
+    return metrics
+
+def _finite_number(value):
+    """`value` en float s'il s'agit d'un nombre fini (bool exclu), sinon None"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return float(value)
+    return None
+
+def _leading_number(text):
+    match = re.match(r'\s*([-+]?\d+(?:\.\d+)?)', text or '')
+    return float(match.group(1)) if match else None
+
+def report_metrics(full_report):
+    """Métriques numériques d'un rapport JSON, y compris les anciens rapports au format texte"""
+    metrics = full_report.get('metrics')
+    metrics = {name: _finite_number(value) for name, value in metrics.items()} if isinstance(metrics, dict) else {}
+    metrics = {name: value for name, value in metrics.items() if value is not None}
+    performance = full_report.get('performance') or {}
+    if not metrics:
+        legacy = {
+            'cpu_benchmark_seconds': performance.get('cpu_benchmark'),
+            'disk_write_mb_per_s': performance.get('disk_write'),
+            'disk_read_mb_per_s': performance.get('disk_read'),
+            'network_latency_ms': performance.get('network_latency'),
+        }
+        for name, text in legacy.items():
+            value = _leading_number(text) if isinstance(text, str) and 'N/A' not in text else None
+            if value is not None:
+                metrics[name] = value
+    score = _finite_number(full_report.get('score'))
+    if score is not None:
+        metrics['score'] = score
+    return metrics
+
+def report_timestamp(full_report):
+    """Horodatage (epoch) d'un rapport"""
+    try:
+        return datetime.fromisoformat(str(full_report['date'])).timestamp()
+    except (KeyError, ValueError):
+        return time.time()
+
+def data_dir():
+    """Dossier de données persistantes de l'outil"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'outil-diagnostic')
+
+class HistoryStore:
+    """Historique des mesures en SQLite, en ajout seul, indexé par hôte, métrique et date"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            host TEXT NOT NULL,
+            ts REAL NOT NULL,
+            kind TEXT NOT NULL,
+            source TEXT UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS samples (
+            host TEXT NOT NULL,
+            metric TEXT NOT NULL,
+            ts REAL NOT NULL,
+            run_id INTEGER NOT NULL,
+            value REAL NOT NULL,
+            PRIMARY KEY (host, metric, ts, run_id)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path=None):
+        import sqlite3
+        self.path = path or os.environ.get('OUTIL_DIAG_HISTORY') or os.path.join(data_dir(), 'history.db')
+        if self.path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.executescript(self.SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _insert(self, host, ts, metrics, kind, source):
+        cursor = self.db.execute('INSERT OR IGNORE INTO runs (host, ts, kind, source) VALUES (?, ?, ?, ?)', (host, ts, kind, source))
+        if not cursor.rowcount:
+            return False
+        run_id = cursor.lastrowid
+        self.db.executemany(
+            'INSERT INTO samples (host, metric, ts, run_id, value) VALUES (?, ?, ?, ?, ?)',
+            [(host, metric, ts, run_id, value) for metric, value in metrics.items()],
+        )
+        return True
+
+    def record(self, host, ts, metrics, kind='bench', source=None):
+        """Ajoute une exécution et ses métriques"""
+        with self.db:
+            return self._insert(host, ts, metrics, kind, source)
+
+    def record_report(self, full_report, source=None):
+        """Ajoute un rapport de performance complet"""
+        return self.record(full_report.get('hostname', 'N/A'), report_timestamp(full_report), report_metrics(full_report), 'bench', source)
+
+    def import_reports(self, reports):
+        """Ingère des (source, rapport) en une transaction; les sources déjà connues sont ignorées"""
+        added = 0
+        with self.db:
+            for source, full_report in reports:
+                added += self._insert(full_report.get('hostname', 'N/A'), report_timestamp(full_report), report_metrics(full_report), 'bench', source)
+        return added
+
+    def hosts(self):
+        return [row[0] for row in self.db.execute('SELECT DISTINCT host FROM runs ORDER BY host')]
+
+    def metrics(self, host):
+        return [row[0] for row in self.db.execute('SELECT DISTINCT metric FROM samples WHERE host = ? ORDER BY metric', (host,))]
+
+    def series(self, host, metric, limit=None):
+        """Dernières valeurs (ts, valeur) d'une métrique, de la plus récente à la plus ancienne"""
+        return self.db.execute(
+            'SELECT ts, value FROM samples WHERE host = ? AND metric = ? ORDER BY ts DESC LIMIT ?',
+            (host, metric, -1 if limit is None else limit),
+        ).fetchall()
+
+    def latest(self, host):
+        """Dernière valeur (ts, valeur) de chaque métrique de l'hôte"""
+        rows = self.db.execute(
+            'SELECT metric, MAX(ts), value FROM samples WHERE host = ? GROUP BY metric', (host,),
+        )
+        return {metric: (ts, value) for metric, ts, value in rows}
+
+    def compare(self, host, window=20, threshold=3.0, min_change=0.05, min_runs=5):
+        """Compare la dernière valeur de chaque métrique à la ligne de base des `window` précédentes
+
+        Ligne de base robuste: médiane et écart absolu médian (MAD). Une métrique régresse si elle
+        s'éloigne dans le mauvais sens de plus de `threshold` MAD normalisés et de plus de
+        `min_change` en relatif (pour ignorer les séries presque constantes).
+        """
+        import statistics
+        rows = []
+        for metric in self.metrics(host):
+            series = self.series(host, metric, window + 1)
+            if len(series) < min_runs + 1:
+                continue
+            latest = series[0][1]
+            baseline = [value for _, value in series[1:]]
+            median = statistics.median(baseline)
+            mad = statistics.median(abs(v - median) for v in baseline) * 1.4826
+            direction = METRIC_DIRECTION.get(metric, 1)
+            delta = (latest - median) * direction
+            relative = delta / abs(median) if median else 0.0
+            z = delta / mad if mad else (math.copysign(math.inf, delta) if delta else 0.0)
+            rows.append({
+                'metric': metric,
+                'latest': latest,
+                'baseline_median': median,
+                'baseline_mad': mad,
+                'runs': len(baseline),
+                'z': z,
+                'change_percent': relative * 100,
+                'regression': z <= -threshold and relative <= -min_change,
+                'improvement': z >= threshold and relative >= min_change,
+            })
+        return rows
+
+def record_history(full_report):
+    """Ajoute le rapport à l'historique local; retourne False si l'historique est inaccessible"""
+    import sqlite3
+    try:
+        with HistoryStore() as store:
+            store.record_report(full_report)
+        return True
+    except (OSError, sqlite3.Error):
+        return False
+
+# Métriques comparées à l'échelle d'un parc (les anciens rapports n'ont que le temps CPU en secondes)
+FLEET_METRICS = (
+    'cpu_single_core_score', 'cpu_all_core_score', 'cpu_benchmark_seconds',
+    'memory_dram_copy_gb_per_s', 'memory_multi_copy_gb_per_s', 'memory_latency_ns',
+    'disk_write_mb_per_s', 'disk_read_mb_per_s', 'disk_rand_read_iops',
+    'network_latency_ms', 'score',
+)
+FleetRow = namedtuple('FleetRow', 'host ts source metrics invalid')
+
+def parse_report_file(path):
+    """Lit un rapport et n'en garde que l'hôte, la date et les métriques du parc (exécuté dans un processus fils)"""
+    full_report = load_report(path)
+    if full_report is None:
+        return None
+    metrics = report_metrics(full_report)
+    # Valeurs présentes mais inutilisables (null, texte, infini): ignorées et comptées
+    raw = full_report.get('metrics') if isinstance(full_report.get('metrics'), dict) else {}
+    raw = dict(raw, score=full_report['score']) if 'score' in full_report else raw
+    invalid = sum(1 for name in FLEET_METRICS if name in raw and name not in metrics)
+    return FleetRow(str(full_report.get('hostname', 'N/A')), report_timestamp(full_report), path,
+                    tuple(metrics.get(name, math.nan) for name in FLEET_METRICS), invalid)
+
+class FleetTable:
+    """Bloc de rapports en colonnes: une array('d') par métrique, NaN pour les valeurs absentes"""
+
+    def __init__(self, rows):
+        self.hosts = [row.host for row in rows]
+        self.sources = [row.source for row in rows]
+        self.invalid = [row.invalid for row in rows]
+        self.columns = {name: array('d', (row.metrics[i] for row in rows)) for i, name in enumerate(FLEET_METRICS)}
+
+    def __len__(self):
+        return len(self.hosts)
+
+class FleetDistribution:
+    """Distribution d'une métrique sur tout le parc en mémoire bornée
+
+    Moyenne et variance par fusion de blocs (Chan), quantiles par histogramme logarithmique
+    (~3% de précision relative, bornés aux valeurs vues dans chaque classe), et les K pires
+    hôtes (chacun une seule fois) dans un tas borné pour les valeurs aberrantes.
+    """
+    HIST_RESOLUTION = 32
+
+    def __init__(self, name, keep=10):
+        self.name = name
+        self.direction = METRIC_DIRECTION.get(name, 1)
+        self.keep = keep
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._hist = {}
+        self._worst = []
+        self._worst_by_host = {}
+
+    def _bucket(self, value):
+        return int(math.floor(math.log(value) * self.HIST_RESOLUTION)) if value > 0 else None
+
+    def update(self, column, hosts, sources):
+        """Intègre une colonne d'un FleetTable"""
+        values = [v for v in column if not math.isnan(v)]
+        if not values:
+            return
+        n = len(values)
+        mean = math.fsum(values) / n
+        m2 = math.fsum((v - mean) ** 2 for v in values)
+        delta = mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, min(values))
+        self.max = max(self.max, max(values))
+        # Classe -> [effectif, plus petite valeur, plus grande valeur]
+        for value in values:
+            entry = self._hist.get(self._bucket(value))
+            if entry is None:
+                self._hist[self._bucket(value)] = [1, value, value]
+            else:
+                entry[0] += 1
+                entry[1] = min(entry[1], value)
+                entry[2] = max(entry[2], value)
+        # Tas des pires valeurs: clé = valeur orientée pour que la pire soit la plus grande.
+        # Un hôte n'y figure qu'une fois, avec sa pire valeur.
+        for value, host, source in zip(column, hosts, sources):
+            if math.isnan(value):
+                continue
+            item = (-value * self.direction, host, source, value)
+            current = self._worst_by_host.get(host)
+            if current is not None:
+                if item > current:
+                    self._worst[self._worst.index(current)] = item
+                    heapq.heapify(self._worst)
+                    self._worst_by_host[host] = item
+            elif len(self._worst) < self.keep:
+                heapq.heappush(self._worst, item)
+                self._worst_by_host[host] = item
+            elif item > self._worst[0]:
+                del self._worst_by_host[heapq.heapreplace(self._worst, item)[1]]
+                self._worst_by_host[host] = item
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def quantile(self, q):
+        """Quantile approché depuis l'histogramme, interpolé entre les valeurs vues dans sa classe"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self._hist, key=lambda b: -math.inf if b is None else b):
+            count, low, high = self._hist[bucket]
+            if seen + count > rank:
+                return low + (high - low) * (rank - seen) / (count - 1) if count > 1 else low
+            seen += count
+        return self.max
+
+    def outliers(self, fence=3.0):
+        """Pires hôtes au-delà des barrières de Tukey (Q1 - fence·IQR ou Q3 + fence·IQR selon le sens)
+
+        L'écart interquartile est au moins la largeur d'une classe autour de la médiane: en deçà,
+        l'histogramme ne distingue plus les valeurs.
+        """
+        if self.count < 4:
+            return []
+        q1, q3 = self.quantile(0.25), self.quantile(0.75)
+        iqr = max(q3 - q1, abs(self.quantile(0.5)) * (math.exp(1 / self.HIST_RESOLUTION) - 1))
+        limit = q1 - fence * iqr if self.direction > 0 else q3 + fence * iqr
+        worst = sorted(self._worst, reverse=True)
+        return [{'host': host, 'source': source, 'value': value, 'limit': limit}
+                for _, host, source, value in worst if (value - limit) * self.direction < 0]
+
+    def to_dict(self):
+        summary = {'metric': self.name, 'count': self.count}
+        if self.count:
+            summary.update(mean=self.mean, stdev=self.stdev, min=self.min, max=self.max,
+                           **{f'p{int(q * 100)}': self.quantile(q) for q in (0.05, 0.25, 0.5, 0.75, 0.95)})
+        summary['outliers'] = self.outliers()
+        return summary
+
+def iter_fleet_tables(paths, workers=None, chunk=512):
+    """Lit les rapports par blocs de `chunk` dans un pool de processus et produit des FleetTable
+
+    Les chemins sont consommés paresseusement: au plus un bloc est en vol à la fois.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    files = iter_report_files(paths)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = list(itertools.islice(files, chunk))
+            if not batch:
+                return
+            rows = [row for row in pool.map(parse_report_file, batch, chunksize=32) if row is not None]
+            if rows:
+                yield FleetTable(rows)
+
+def aggregate_reports(paths, workers=None, keep=10, progress=None):
+    """Distributions du parc pour FLEET_METRICS en une seule passe sur les rapports"""
+    distributions = {name: FleetDistribution(name, keep) for name in FLEET_METRICS}
+    hosts = set()
+    invalid = {}
+    reports = 0
+    for table in iter_fleet_tables(paths, workers):
+        reports += len(table)
+        hosts.update(table.hosts)
+        for host, count in zip(table.hosts, table.invalid):
+            if count:
+                invalid[host] = invalid.get(host, 0) + count
+        for name, column in table.columns.items():
+            distributions[name].update(column, table.hosts, table.sources)
+        if progress:
+            progress(reports)
+    return {'reports': reports, 'hosts': len(hosts), 'invalid': invalid,
+            'metrics': {name: dist.to_dict() for name, dist in distributions.items() if dist.count}}
+
+def performance_test():
+    """Option 3: Test de performance et rapport de santé"""
+    clear_screen()
+    print(f"{Colors.BLUE}{'='*60}{Colors.ENDC}")
+    print(f"{Colors.BOLD}TEST DE PERFORMANCE & RAPPORT DE SANTÉ{Colors.ENDC}")
+    print(f"{Colors.BLUE}{'='*60}{Colors.ENDC}\n")
+    
+    results = sorted(iter_bench(progress=print), key=check_order(BENCH_CHECKS))
+    full_report = build_report(results)
+    report = full_report['performance']
+    score = full_report['score']
+    
+    print(f"\n{Colors.GREEN}RAPPORT DE PERFORMANCE:{Colors.ENDC}")
+    print(f"{Colors.CYAN}{'─'*60}{Colors.ENDC}")
+    
+    print(f"\n{Colors.BOLD}Benchmarks:{Colors.ENDC}")
+    print(f"  CPU Benchmark: {report.get('cpu_benchmark', 'N/A')}")
+    print(f"  CPU multi-cœurs: {report.get('cpu_multicore', 'N/A')}")
+    print(f"  Vitesse écriture disque: {report.get('disk_write', 'N/A')}")
+    print(f"  Vitesse lecture disque: {report.get('disk_read', 'N/A')}")
+    print(f"  Lecture disque (mmap): {report.get('disk_mmap_read', 'N/A')}")
+    print(f"  Lecture aléatoire 4K: {report.get('disk_rand_read', 'N/A')}")
+    print(f"  Écriture aléatoire 4K: {report.get('disk_rand_write', 'N/A')}")
+    print(f"  Latence réseau: {report.get('network_latency', 'N/A')}")
+    
+    print(f"\n{Colors.BOLD}Top 5 processus (CPU):{Colors.ENDC}")
+    for proc in full_report['top_cpu_processes']:
+        print(f"  {proc['name'][:30]:30} - {proc['cpu_percent']:.1f}%")
+    
+    print(f"\n{Colors.BOLD}Top 5 processus (RAM):{Colors.ENDC}")
+    for proc in full_report['top_mem_processes']:
+        print(f"  {proc['name'][:30]:30} - {proc['memory_percent']:.1f}%")
+    
+    print(f"\n{Colors.CYAN}{'─'*60}{Colors.ENDC}")
+    if score >= 80:
+        print(f"{Colors.GREEN}🚀 SCORE DE PERFORMANCE: {score}/100 - Excellente!{Colors.ENDC}")
+    elif score >= 60:
+        print(f"{Colors.WARNING}SCORE DE PERFORMANCE: {score}/100 - Bonne{Colors.ENDC}")
+    else:
+        print(f"{Colors.FAIL}SCORE DE PERFORMANCE: {score}/100 - À améliorer{Colors.ENDC}")
+    if not record_history(full_report):
+        print(f"{Colors.WARNING}Historique local inaccessible, mesure non archivée{Colors.ENDC}")
+    save = input(f"\nVoulez-vous sauvegarder le rapport complet? (o/n): ")
+    if save.lower() == 'o':
+        filename = save_report(full_report)
+        print(f"{Colors.GREEN}Rapport sauvegardé dans: {filename}{Colors.ENDC}")
+    
+    input(f"\n{Colors.CYAN}Appuyez sur Entrée pour continuer...{Colors.ENDC}")
+
+def main_menu():
+    """Menu principal"""
+    get_sampler()
+    while True:
+        display_system_info()
+        
+        print(f"\n{Colors.BOLD}{Colors.GREEN}OPTIONS DISPONIBLES:{Colors.ENDC}")
+        print(f"{Colors.CYAN}{'─'*60}{Colors.ENDC}")
+        print(f"  {Colors.BOLD}1{Colors.ENDC} - Scanner les composants et vérifier leur état")
+        print(f"  {Colors.BOLD}2{Colors.ENDC} - Récupérer la clé de licence Windows")
+        print(f"  {Colors.BOLD}3{Colors.ENDC} - Test de performance et rapport de santé")
+        print(f"  {Colors.BOLD}4{Colors.ENDC} - Tableau de bord en direct")
+        print(f"  {Colors.BOLD}0{Colors.ENDC} - Quitter")
+        print(f"{Colors.CYAN}{'─'*60}{Colors.ENDC}")
+        
+        choice = input(f"\n{Colors.BOLD}Votre choix: {Colors.ENDC}")
+        
+        if choice == '1':
+            scan_components()
+        elif choice == '2':
+            get_windows_license()
+        elif choice == '3':
+            performance_test()
+        elif choice == '4':
+            run_dashboard_loop()
+        elif choice == '0':
+            print(f"\n{Colors.GREEN}Au revoir!{Colors.ENDC}")
+            sys.exit(0)
+        else:
+            print(f"{Colors.WARNING}Option invalide!{Colors.ENDC}")
+            time.sleep(1)
+
+class RingSeries:
+    """Série temporelle de taille fixe sur un array('d'), avec min/max/moyenne/p95 glissants
+
+    Chaque ajout est en O(1) amorti: la somme est tenue à jour, min et max par des
+    files monotones d'indices, et le p95 par un histogramme logarithmique (~3% de précision).
+    """
+    HIST_RESOLUTION = 32
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.values = array('d', bytes(8 * capacity))
+        self.count = 0
+        self.total = 0.0
+        self._min = deque()
+        self._max = deque()
+        self._hist = {}
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def _bucket(self, value):
+        return int(math.log1p(max(value, 0.0)) * self.HIST_RESOLUTION)
+
+    def append(self, value):
+        index = self.count
+        slot = index % self.capacity
+        if index >= self.capacity:
+            old = self.values[slot]
+            self.total -= old
+            bucket = self._bucket(old)
+            self._hist[bucket] -= 1
+            if not self._hist[bucket]:
+                del self._hist[bucket]
+            expired = index - self.capacity
+            if self._min and self._min[0] == expired:
+                self._min.popleft()
+            if self._max and self._max[0] == expired:
+                self._max.popleft()
+        self.values[slot] = value
+        self.total += value
+        if slot == self.capacity - 1:
+            # Recalcul complet une fois par tour pour ne pas accumuler d'erreur d'arrondi
+            self.total = math.fsum(self.values)
+        bucket = self._bucket(value)
+        self._hist[bucket] = self._hist.get(bucket, 0) + 1
+        while self._min and self.values[self._min[-1] % self.capacity] >= value:
+            self._min.pop()
+        self._min.append(index)
+        while self._max and self.values[self._max[-1] % self.capacity] <= value:
+            self._max.pop()
+        self._max.append(index)
+        self.count += 1
+
+    @property
+    def last(self):
+        return self.values[(self.count - 1) % self.capacity] if self.count else None
+
+    def min(self):
+        return self.values[self._min[0] % self.capacity] if self._min else None
+
+    def max(self):
+        return self.values[self._max[0] % self.capacity] if self._max else None
+
+    def avg(self):
+        return self.total / len(self) if self.count else None
+
+    def percentile(self, pct):
+        """Percentile approché à partir de l'histogramme (borné par le min et le max réels)"""
+        if not self.count:
+            return None
+        rank = pct / 100 * len(self)
+        seen = 0
+        for bucket in sorted(self._hist):
+            seen += self._hist[bucket]
+            if seen >= rank:
+                value = math.expm1((bucket + 0.5) / self.HIST_RESOLUTION)
+                return min(max(value, self.min()), self.max())
+        return self.max()
+
+    def stats(self):
+        return {
+            'last': self.last,
+            'min': self.min(),
+            'max': self.max(),
+            'avg': self.avg(),
+            'p95': self.percentile(95),
+        }
+
+class Monitor:
+    """Échantillonne CPU, mémoire, disque et réseau dans des RingSeries"""
+    METRICS = ('cpu_percent', 'memory_percent', 'disk_read_bps', 'disk_write_bps', 'net_sent_bps', 'net_recv_bps')
+    SATURATION = {'cpu_percent': 'cpu_usage_percent', 'memory_percent': 'memory_usage_percent'}
+
+    def __init__(self, window):
+        self.series = {name: RingSeries(window) for name in self.METRICS}
+        self.saturated = dict.fromkeys(self.SATURATION, 0)
+        # Température CPU en plus, si un capteur sysfs la fournit (relue par pread)
+        self.sysfs = get_sysfs()
+        if self.sysfs is not None and self.sysfs.cpu_temperature() is not None:
+            self.series['cpu_temperature_c'] = RingSeries(window)
+            self.saturated['cpu_temperature_c'] = 0
+        self._last = self._read_counters()
+
+    def _read_counters(self):
+        cpu = psutil.cpu_times()
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        idle = cpu.idle + getattr(cpu, 'iowait', 0.0)
+        return (
+            time.monotonic(),
+            sum(cpu) - idle,
+            idle,
+            (disk.read_bytes, disk.write_bytes) if disk else (0, 0),
+            (net.bytes_sent, net.bytes_recv) if net else (0, 0),
+        )
+
+    def sample(self):
+        """Prend un échantillon (deltas depuis le précédent) et le range dans les séries"""
+        now = self._read_counters()
+        then, self._last = self._last, now
+        elapsed = max(now[0] - then[0], 1e-9)
+        busy, idle = now[1] - then[1], now[2] - then[2]
+        values = {
+            'cpu_percent': 100.0 * busy / (busy + idle) if busy + idle > 0 else 0.0,
+            'memory_percent': psutil.virtual_memory().percent,
+            'disk_read_bps': (now[3][0] - then[3][0]) / elapsed,
+            'disk_write_bps': (now[3][1] - then[3][1]) / elapsed,
+            'net_sent_bps': (now[4][0] - then[4][0]) / elapsed,
+            'net_recv_bps': (now[4][1] - then[4][1]) / elapsed,
+        }
+        if 'cpu_temperature_c' in self.series:
+            temp = self.sysfs.cpu_temperature()
+            if temp is not None:
+                values['cpu_temperature_c'] = temp
+        for name, value in values.items():
+            self.series[name].append(value)
+        for name in self.saturated:
+            if name in values and grade(values[name], self.SATURATION.get(name, name)) is not Status.OK:
+                self.saturated[name] += 1
+        return values
+
+    def summary(self):
+        return {
+            'check': 'monitor',
+            'hostname': socket.gethostname(),
+            'date': str(datetime.now()),
+            'samples': self.series['cpu_percent'].count,
+            'saturated_samples': dict(self.saturated),
+            'metrics': {name: series.stats() for name, series in self.series.items()},
+        }
+
+def format_monitor_summary(summary):
+    """Résumé texte d'une ligne pour le mode monitor"""
+    m = summary['metrics']
+    mb = 1024 ** 2
+    temp = m.get('cpu_temperature_c', {}).get('last')
+    temp_text = f"{temp:.0f}°C " if temp is not None else ""
+    return (
+        f"{summary['date'][:19]} n={summary['samples']} "
+        f"CPU {m['cpu_percent']['last']:.1f}% (max {m['cpu_percent']['max']:.1f}, p95 {m['cpu_percent']['p95']:.1f}) {temp_text}"
+        f"RAM {m['memory_percent']['last']:.1f}% (max {m['memory_percent']['max']:.1f}) "
+        f"Disque R/W {m['disk_read_bps']['avg'] / mb:.1f}/{m['disk_write_bps']['avg'] / mb:.1f} MB/s "
+        f"Réseau TX/RX {m['net_sent_bps']['avg'] / mb:.2f}/{m['net_recv_bps']['avg'] / mb:.2f} MB/s "
+        f"saturations CPU/RAM {summary['saturated_samples']['cpu_percent']}/{summary['saturated_samples']['memory_percent']}"
+    )
+
+def run_monitor(args):
+    """Commande monitor: surveillance continue à mémoire constante"""
+    import json
+    monitor = Monitor(args.window)
+    deadline = time.monotonic() + args.duration if args.duration else None
+    next_tick = time.monotonic()
+    reported = -1
+
+    def report():
+        nonlocal reported
+        reported = monitor.series['cpu_percent'].count
+        summary = monitor.summary()
+        if args.format == 'text':
+            print(format_monitor_summary(summary), flush=True)
+        else:
+            print(json.dumps(summary, default=str, ensure_ascii=False), flush=True)
+
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            next_tick += args.interval
+            time.sleep(max(0.0, next_tick - time.monotonic()))
+            monitor.sample()
+            if monitor.series['cpu_percent'].count % args.report_every == 0:
+                report()
+    except KeyboardInterrupt:
+        pass
+    if reported != monitor.series['cpu_percent'].count:
+        report()
+    return 0
+
+class MetricFamily:
+    """Famille de métriques au format texte OpenMetrics"""
+
+    def __init__(self, name, kind, help_text):
+        # Les échantillons d'une famille 'info' portent le suffixe _info
+        self.name = f"{name}_info" if kind == 'info' else name
+        self.lines = [f"# TYPE {name} {kind}", f"# HELP {name} {help_text}"]
+        self.empty = True
+
+    def add(self, value, **labels):
+        """Ajoute un échantillon; les valeurs absentes ou non numériques sont ignorées"""
+        if isinstance(value, bool):
+            value = int(value)
+        if not isinstance(value, (int, float)) or math.isnan(value):
+            return self
+        text = ','.join('{}="{}"'.format(key, str(val).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+                        for key, val in labels.items())
+        value = ('+Inf' if value > 0 else '-Inf') if math.isinf(value) else repr(value)
+        self.lines.append(f"{self.name}{{{text}}} {value}" if text else f"{self.name} {value}")
+        self.empty = False
+        return self
+
+    def render(self):
+        return '' if self.empty else '\n'.join(self.lines) + '\n'
+
+def system_metrics():
+    """Métriques de get_system_info() (inventaire et valeurs volatiles), en familles OpenMetrics"""
+    inventory = get_inventory()
+    facts = inventory.static()
+    info = inventory.system_info()
+    mem = inventory.volatile('memory')
+    disk = inventory.volatile('disk')
+    return [
+        MetricFamily('outil_diag_system', 'info', "Identité de la machine").add(
+            1, hostname=facts['hostname'], os=facts['os'], os_version=facts['os_version'],
+            architecture=facts['architecture'], processor=facts['processor'], ip_address=info['ip_address']),
+        MetricFamily('outil_diag_cpu_cores', 'gauge', "Nombre de cœurs CPU")
+            .add(facts['cpu_physical_cores'], kind='physical').add(facts['cpu_total_cores'], kind='logical'),
+        MetricFamily('outil_diag_cpu_frequency_mhz', 'gauge', "Fréquence CPU courante").add(info['cpu_freq']),
+        MetricFamily('outil_diag_memory_bytes', 'gauge', "Mémoire vive")
+            .add(mem.total, kind='total').add(mem.used, kind='used').add(mem.available, kind='available'),
+        MetricFamily('outil_diag_root_filesystem_bytes', 'gauge', "Système de fichiers racine")
+            .add(disk.total, kind='total').add(disk.used, kind='used').add(disk.free, kind='free'),
+        MetricFamily('outil_diag_boot_time_seconds', 'gauge', "Heure de démarrage (epoch)").add(facts['boot_time']),
+    ]
+
+def scan_metrics(results):
+    """Résultats d'un scan (dont santé et usure SMART par disque), en familles OpenMetrics"""
+    status = MetricFamily('outil_diag_check_status', 'stateset', "État de chaque vérification du scan")
+    cpu_usage = MetricFamily('outil_diag_cpu_usage_percent', 'gauge', "Charge CPU moyenne sur 5 s")
+    cpu_temp = MetricFamily('outil_diag_cpu_temperature_celsius', 'gauge', "Température CPU")
+    memory = MetricFamily('outil_diag_memory_usage_percent', 'gauge', "Occupation de la RAM")
+    disk_usage = MetricFamily('outil_diag_disk_usage_percent', 'gauge', "Occupation de chaque partition")
+    smart_healthy = MetricFamily('outil_diag_smart_healthy', 'gauge', "1 si tous les disques physiques de la partition passent le test SMART")
+    smart_life = MetricFamily('outil_diag_smart_life_percent', 'gauge', "Durée de vie restante estimée par disque physique")
+    battery = MetricFamily('outil_diag_battery_percent', 'gauge', "Charge de la batterie")
+    life_seen = set()
+    for result in results:
+        metrics = result.metrics
+        # Un même périphérique peut être monté plusieurs fois: le point de montage distingue les séries
+        for state in Status:
+            status.add(result.status is state, check=result.check, component=result.component,
+                       mountpoint=metrics.get('mountpoint', ''), outil_diag_check_status=state.value)
+        if result.check == 'cpu':
+            cpu_usage.add(metrics.get('usage_percent'))
+            cpu_temp.add(metrics.get('temperature_c'))
+        elif result.check == 'memory':
+            memory.add(metrics.get('usage_percent'))
+        elif result.check == 'battery':
+            battery.add(metrics.get('percent'))
+        elif result.check == 'disk':
+            labels = {'device': result.component, 'mountpoint': metrics.get('mountpoint', '')}
+            disk_usage.add(metrics.get('usage_percent'), **labels)
+            smart_healthy.add(metrics.get('smart_passed'), **labels)
+            for device, life in zip(metrics.get('physical_devices', []), metrics.get('life_percent', [])):
+                if device not in life_seen:
+                    life_seen.add(device)
+                    smart_life.add(life, device=device)
+    return [status, cpu_usage, cpu_temp, memory, disk_usage, smart_healthy, smart_life, battery]
+
+def bench_history_metrics(host):
+    """Dernières valeurs de benchmark archivées pour l'hôte, en familles OpenMetrics"""
+    import sqlite3
+    value = MetricFamily('outil_diag_benchmark', 'gauge', "Dernier résultat de benchmark archivé, par métrique")
+    timestamp = MetricFamily('outil_diag_benchmark_timestamp_seconds', 'gauge', "Date du dernier résultat archivé (epoch)")
+    try:
+        with HistoryStore() as store:
+            latest = store.latest(host)
+    except (OSError, sqlite3.Error):
+        latest = {}
+    for metric, (ts, val) in sorted(latest.items()):
+        value.add(val, metric=metric)
+        timestamp.add(ts, metric=metric)
+    return [value, timestamp]
+
+class Exporter:
+    """Exportateur OpenMetrics: chaque collecteur tourne dans son propre fil à son rythme
+
+    Une requête HTTP ne déclenche jamais de collecte: elle sert les derniers octets
+    construits, recalculés seulement quand un collecteur termine.
+    """
+
+    def __init__(self, system_interval=15, scan_interval=300, bench_interval=0, history_interval=60):
+        self.intervals = {'system': system_interval, 'scan': scan_interval, 'bench': bench_interval, 'history': history_interval}
+        self.collectors = {'system': self._collect_system, 'scan': self._collect_scan,
+                           'bench': self._collect_bench, 'history': self._collect_history}
+        self.families = {}
+        self.stats = {}
+        self.payload = b"# EOF\n"
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _collect_system(self):
+        return system_metrics()
+
+    def _collect_scan(self):
+        return scan_metrics(list(iter_scan()))
+
+    def _collect_bench(self):
+        if not record_history(build_report(list(iter_bench()))):
+            raise OSError("historique local inaccessible")
+        return self._collect_history()
+
+    def _collect_history(self):
+        return bench_history_metrics(get_inventory().static()['hostname'])
+
+    def _render(self):
+        success = MetricFamily('outil_diag_collector_success', 'gauge', "1 si la dernière collecte a réussi")
+        last = MetricFamily('outil_diag_collector_last_run_timestamp_seconds', 'gauge', "Fin de la dernière collecte (epoch)")
+        duration = MetricFamily('outil_diag_collector_duration_seconds', 'gauge', "Durée de la dernière collecte")
+        for name, (ok, ended, seconds) in sorted(self.stats.items()):
+            success.add(ok, collector=name)
+            last.add(ended, collector=name)
+            duration.add(seconds, collector=name)
+        families = [family for name in self.collectors for family in self.families.get(name, ())]
+        text = ''.join(family.render() for family in families + [success, last, duration])
+        self.payload = (text + "# EOF\n").encode('utf-8')
+
+    def refresh(self, name):
+        """Exécute un collecteur et reconstruit la réponse"""
+        started = time.monotonic()
+        try:
+            families = self.collectors[name]()
+            ok = True
+        except Exception:
+            families, ok = None, False
+        with self._lock:
+            if families is not None:
+                self.families[name] = families
+            self.stats[name] = (ok, time.time(), time.monotonic() - started)
+            self._render()
+
+    def _loop(self, name, interval):
+        if name == 'bench':
+            # Pas de benchmark au démarrage: l'historique sert la dernière mesure connue
+            if self._stop.wait(interval):
+                return
+        while True:
+            self.refresh(name)
+            if self._stop.wait(interval):
+                return
+
+    def start(self):
+        for name, interval in self.intervals.items():
+            if interval > 0:
+                thread = threading.Thread(target=self._loop, args=(name, interval), name=f'exporter-{name}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+
+    def handler(self):
+        """Classe de gestionnaire HTTP servant self.payload sur /metrics"""
+        from http.server import BaseHTTPRequestHandler
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    body, content_type, code = b"Outil diagnostic - metriques sur /metrics\n", 'text/plain; charset=utf-8', 200 if self.path == '/' else 404
+                else:
+                    body, content_type, code = exporter.payload, 'application/openmetrics-text; version=1.0.0; charset=utf-8', 200
+                self.send_response(code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+class Screen:
+    """Terminal plein écran à redessin différentiel
+
+    Chaque image est une liste de lignes de segments (texte, style). Seules les cellules qui
+    diffèrent de l'image précédente sont réécrites, par adressage du curseur ANSI, en une
+    seule écriture.
+    """
+
+    def __init__(self, out=None):
+        self.out = out or sys.stdout
+        self._cells = []
+        self._size = None
+
+    def __enter__(self):
+        # Écran alternatif, curseur masqué
+        self.out.write("\033[?1049h\033[?25l\033[2J")
+        self.out.flush()
+        return self
+
+    def __exit__(self, *exc):
+        self.out.write(f"{Colors.ENDC}\033[?25h\033[?1049l")
+        self.out.flush()
+
+    def draw(self, lines):
+        """Affiche une image; retourne le nombre de cellules réécrites"""
+        import shutil
+        size = shutil.get_terminal_size()
+        width, height = size.columns, size.lines
+        if size != self._size:
+            self._size = size
+            self._cells = []
+            self.out.write("\033[2J")
+        blank = (' ', '')
+        output, style, changed = [], None, 0
+        for row in range(height):
+            cells = [(char, seg_style) for text, seg_style in (lines[row] if row < len(lines) else ()) for char in text][:width]
+            cells += [blank] * (width - len(cells))
+            previous = self._cells[row] if row < len(self._cells) else None
+            if cells == previous:
+                continue
+            col = 0
+            while col < width:
+                if previous is not None and cells[col] == previous[col]:
+                    col += 1
+                    continue
+                output.append(f"\033[{row + 1};{col + 1}H")
+                while col < width and (previous is None or cells[col] != previous[col]):
+                    char, cell_style = cells[col]
+                    if cell_style != style:
+                        output.append(Colors.ENDC + cell_style)
+                        style = cell_style
+                    output.append(char)
+                    changed += 1
+                    col += 1
+            if row < len(self._cells):
+                self._cells[row] = cells
+            else:
+                self._cells.append(cells)
+        if output:
+            output.append(Colors.ENDC)
+            self.out.write(''.join(output))
+            self.out.flush()
+        return changed
+
+def _bar(percent, width, key):
+    """Barre de progression colorée selon les seuils de `key`"""
+    filled = round(max(0.0, min(percent or 0.0, 100.0)) / 100 * width)
+    return [('█' * filled, STATUS_COLOR[grade(percent, key)]), ('·' * (width - filled), Colors.CYAN)]
+
+SPARK = '▁▂▃▄▅▆▇█'
+
+def _sparkline(series, width):
+    """Dernières valeurs (0-100) d'une RingSeries en caractères de hauteur"""
+    count = min(len(series), width)
+    values = [series.values[(series.count - count + i) % series.capacity] for i in range(count)]
+    return ''.join(SPARK[min(int(v / 100 * (len(SPARK) - 1) + 0.5), len(SPARK) - 1)] for v in values).rjust(width)
+
+class Dashboard:
+    """Tableau de bord en direct: CPU par cœur, mémoire, débits, partitions, processus
+
+    Les valeurs viennent d'échantillonneurs incrémentaux (CpuSampler en arrière-plan, compteurs
+    du Monitor à 1 Hz, capteurs sysfs); les parties plus lentes (partitions) ont leur propre TTL.
+    """
+    PARTITIONS_TTL = 10
+
+    def __init__(self):
+        self.sampler = get_sampler()
+        self.monitor = Monitor(240)
+        self.monitor_at = 0.0
+        self.rates = {}
+        self.partitions = []
+        self.partitions_at = 0.0
+
+    def refresh(self, now):
+        if now - self.monitor_at >= 1.0:
+            self.monitor_at = now
+            self.rates = self.monitor.sample()
+        if now - self.partitions_at >= self.PARTITIONS_TTL:
+            self.partitions_at = now
+            rows = []
+            for partition in psutil.disk_partitions():
+                try:
+                    rows.append((partition.mountpoint, psutil.disk_usage(partition.mountpoint)))
+                except OSError:
+                    continue
+            self.partitions = rows
+
+    def frame(self, width):
+        """Construit l'image courante (liste de lignes de segments)"""
+        now = time.monotonic()
+        self.refresh(now)
+        inventory = get_inventory()
+        facts = inventory.static()
+        mb = 1024 ** 2
+        uptime = str(datetime.now() - datetime.fromtimestamp(facts['boot_time'])).split('.')[0]
+        lines = [
+            [(f" {facts['hostname']} - {facts['os']} - uptime {uptime} - {datetime.now():%H:%M:%S}", Colors.BOLD + Colors.BLUE)],
+            [('─' * width, Colors.CYAN)],
+        ]
+        bar = max(10, min(40, width - 40))
+        cpu = self.sampler.cpu_percent()
+        temp = self.rates.get('cpu_temperature_c')
+        freq = inventory.volatile('cpu_freq')
+        extra = (f"  {temp:.0f}°C" if temp is not None else "") + (f"  {freq.current:.0f} MHz" if freq else "")
+        lines.append([("CPU   ", Colors.BOLD)] + _bar(cpu, bar, 'cpu_usage_percent') + [(f" {cpu:5.1f}%{extra}", '')])
+        lines.append([("      ", ''), (_sparkline(self.monitor.series['cpu_percent'], bar), Colors.GREEN), (" 1 échantillon/s", Colors.CYAN)])
+        cores = self.sampler.per_cpu_percent()
+        core_bar = 10
+        per_line = max(1, width // (core_bar + 14))
+        for start in range(0, len(cores), per_line):
+            line = []
+            for index in range(start, min(start + per_line, len(cores))):
+                line += [(f" c{index:<3}", Colors.CYAN)] + _bar(cores[index], core_bar, 'cpu_usage_percent') + [(f" {cores[index]:5.1f}%", '')]
+            lines.append(line)
+        mem = inventory.volatile('memory')
+        lines.append([("RAM   ", Colors.BOLD)] + _bar(mem.percent, bar, 'memory_usage_percent')
+                     + [(f" {mem.percent:5.1f}%  {mem.used / 1024 ** 3:.1f}/{mem.total / 1024 ** 3:.1f} GB", '')])
+        lines.append([
+            ("E/S   ", Colors.BOLD),
+            (f"disque L {self.rates.get('disk_read_bps', 0) / mb:7.1f} Mo/s  E {self.rates.get('disk_write_bps', 0) / mb:7.1f} Mo/s   "
+             f"réseau TX {self.rates.get('net_sent_bps', 0) / mb:7.2f} Mo/s  RX {self.rates.get('net_recv_bps', 0) / mb:7.2f} Mo/s", ''),
+        ])
+        lines.append([('─' * width, Colors.CYAN)])
+        for mountpoint, usage in self.partitions[:6]:
+            lines.append([(f"{mountpoint[:20]:20} ", '')] + _bar(usage.percent, bar - 14, 'disk_usage_percent')
+                         + [(f" {usage.percent:5.1f}%  {usage.free / 1024 ** 3:.1f} GB libres", '')])
+        lines.append([('─' * width, Colors.CYAN)])
+        lines.append([(f"{'PID':>7}  {'PROCESSUS':30} {'CPU %':>6}", Colors.BOLD)])
+        for pid, name, percent in self.sampler.top_processes(5):
+            lines.append([(f"{pid:>7}  {(name or '')[:30]:30} {percent or 0.0:6.1f}", '')])
+        lines.append([])
+        lines.append([("q: quitter", Colors.CYAN)])
+        return lines
+
+@contextlib.contextmanager
+def key_reader():
+    """Lecture non bloquante du clavier: fournit wait(timeout) -> touche ou None"""
+    if os.name == 'nt':
+        import msvcrt
+
+        def wait(timeout):
+            end = time.monotonic() + timeout
+            while time.monotonic() < end:
+                if msvcrt.kbhit():
+                    return msvcrt.getwch()
+                time.sleep(min(0.05, max(end - time.monotonic(), 0)))
+            return None
+        yield wait
+        return
+    if not sys.stdin.isatty():
+        yield lambda timeout: time.sleep(timeout)
+        return
+    import select
+    import termios
+    import tty
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    tty.setcbreak(fd)
+
+    def wait(timeout):
+        ready, _, _ = select.select([fd], [], [], timeout)
+        return os.read(fd, 1).decode(errors='ignore') if ready else None
+    try:
+        yield wait
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+
+def run_dashboard_loop(hz=4, duration=None):
+    """Affiche le tableau de bord jusqu'à 'q', Ctrl-C ou la fin de `duration`"""
+    import shutil
+    dashboard = Dashboard()
+    period = 1.0 / hz
+    started = time.monotonic()
+    with Screen() as screen, key_reader() as wait:
+        try:
+            while duration is None or time.monotonic() - started < duration:
+                frame_start = time.monotonic()
+                screen.draw(dashboard.frame(shutil.get_terminal_size().columns))
+                key = wait(max(period - (time.monotonic() - frame_start), 0))
+                if key and key.lower() == 'q':
+                    break
+        except KeyboardInterrupt:
+            pass
+
+def exit_code_for_score(score):
+    """Code de sortie du mode batch: 0 sain, 1 attention, 2 maintenance recommandée"""
+    if score >= 80:
+        return 0
+    if score >= 60:
+        return 1
+    return 2
+
+def emit_records(records, fmt, out=None):
+    """Écrit les résultats au fil de l'eau (ndjson) ou en fin d'exécution (json/texte)"""
+    import json
+    out = out or sys.stdout
+    collected = []
+    for record in records:
+        collected.append(record)
+        if fmt == 'ndjson':
+            out.write(json.dumps(record.to_dict(), default=str, ensure_ascii=False) + '\n')
+            out.flush()
+        elif fmt == 'text':
+            out.write(f"[{record.status.value}] {record.check}: {record.message}\n")
+    return collected
+
+def run_info(args):
+    """Commande info: informations système"""
+    info = get_system_info()
+    if args.format == 'text':
+        for key, value in info.items():
+            print(f"{key}: {value}")
+        return 0
+    import json
+    if args.format == 'ndjson':
+        print(json.dumps({'check': 'info', 'metrics': info}, default=str, ensure_ascii=False))
+    else:
+        print(json.dumps(info, indent=2, default=str, ensure_ascii=False))
+    return 0
+
+def run_scan(args):
+    """Commande scan: diagnostic des composants sans interaction"""
+    import json
+    get_sampler()
+    only = args.only.split(',') if args.only else None
+    unknown = set(only or ()) - {check.name for check in SCAN_CHECKS}
+    if unknown:
+        print(f"Vérifications inconnues: {', '.join(sorted(unknown))}", file=sys.stderr)
+        return 2
+    results = emit_records(iter_scan(deadline=args.deadline, only=only, fresh=args.fresh, max_cost=args.max_cost), args.format)
+    score = scan_score(results)
+    summary = {'check': 'score', 'hostname': socket.gethostname(), 'score': round(score, 1)}
+    if args.format == 'json':
+        print(json.dumps(dict(summary, results=[r.to_dict() for r in results]), indent=2, default=str, ensure_ascii=False))
+    elif args.format == 'ndjson':
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        print(f"SCORE GLOBAL: {score:.0f}%")
+    return exit_code_for_score(score)
+
+def run_bench(args):
+    """Commande bench: benchmarks et rapport de performance sans interaction"""
+    import json
+    get_sampler()
+    disk_options = {
+        'directory': args.disk_dir,
+        'size_mb': args.disk_size,
+        'direct': args.direct,
+        'drop_cache': not args.no_drop_cache,
+    }
+    cpu_options = {'trials': args.cpu_trials}
+    memory_options = {'size_mb': args.mem_size, 'workers': args.mem_workers}
+    options = {'cpu': cpu_options, 'memory': memory_options, 'disk': disk_options}
+    results = emit_records(iter_bench(options=options, deadline=args.deadline), args.format)
+    full_report = build_report(results)
+    score = full_report['score']
+    if args.save:
+        save_report(full_report, args.save)
+    if not args.no_history and not record_history(full_report):
+        print("Historique local inaccessible, mesure non archivée", file=sys.stderr)
+    summary = {'check': 'score', 'hostname': full_report['hostname'], 'score': score}
+    if args.format == 'json':
+        print(json.dumps(full_report, indent=2, default=str, ensure_ascii=False))
+    elif args.format == 'ndjson':
+        print(json.dumps(summary, ensure_ascii=False))
+    else:
+        print(f"SCORE DE PERFORMANCE: {score}/100")
+    return exit_code_for_score(score)
+
+def iter_report_files(paths):
+    """Fichiers de rapport JSON désignés par des chemins (fichiers ou dossiers, récursivement), parcourus paresseusement"""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        pending = [path]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.endswith('.json') and entry.is_file():
+                        yield entry.path
+
+def load_report(path):
+    """Charge un rapport JSON; None si le fichier est illisible"""
+    import json
+    try:
+        with open(path, 'rb') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+def run_history(args):
+    """Commande history: import, consultation et détection de régressions"""
+    import json
+    with HistoryStore(args.db) as store:
+        if args.action == 'import':
+            reports = ((path, report) for path in iter_report_files(args.paths) for report in [load_report(path)] if report)
+            print(f"{store.import_reports(reports)} rapport(s) importé(s)")
+            return 0
+        hosts = [args.host] if args.host else store.hosts()
+        if args.action == 'show':
+            for host in hosts:
+                for metric in [args.metric] if args.metric else store.metrics(host):
+                    for ts, value in store.series(host, metric, args.limit):
+                        print(f"{host}\t{metric}\t{datetime.fromtimestamp(ts).isoformat(' ', 'seconds')}\t{value:.4g}")
+            return 0
+        report = {host: store.compare(host, args.window, args.threshold) for host in hosts}
+    regressions = sum(row['regression'] for rows in report.values() for row in rows)
+    if args.format == 'json':
+        # z infini (MAD nul) n'existe pas en JSON: null
+        print(json.dumps({host: [{key: None if isinstance(value, float) and not math.isfinite(value) else value
+                                  for key, value in row.items()} for row in rows] for host, rows in report.items()}, indent=2))
+    else:
+        for host, rows in report.items():
+            print(f"{Colors.BOLD}{host}{Colors.ENDC}")
+            for row in rows:
+                color = Colors.FAIL if row['regression'] else Colors.GREEN if row['improvement'] else ''
+                flag = "RÉGRESSION" if row['regression'] else "amélioration" if row['improvement'] else "stable"
+                print(
+                    f"  {color}{row['metric']:28} {row['latest']:12.4g} vs médiane {row['baseline_median']:12.4g} "
+                    f"({row['change_percent']:+.1f}%, z={row['z']:+.1f}, n={row['runs']}) {flag}{Colors.ENDC if color else ''}"
+                )
+    return 1 if regressions else 0
+
+def run_aggregate(args):
+    """Commande aggregate: distributions et valeurs aberrantes d'un parc de rapports"""
+    import json
+
+    def progress(count):
+        print(f"\r{count} rapport(s) lus", end='', file=sys.stderr, flush=True)
+
+    summary = aggregate_reports(args.paths, args.workers, args.top, None if args.format == 'json' or not sys.stderr.isatty() else progress)
+    if args.format == 'json':
+        print(json.dumps(summary, indent=2))
+        return 0 if summary['reports'] else 2
+    if sys.stderr.isatty():
+        print(file=sys.stderr)
+    print(f"{Colors.BOLD}{summary['reports']} rapport(s), {summary['hosts']} hôte(s){Colors.ENDC}")
+    print(f"{'métrique':28} {'n':>6} {'moyenne':>10} {'écart-type':>10} {'min':>10} {'p5':>10} {'p50':>10} {'p95':>10} {'max':>10}")
+    for name, stats in summary['metrics'].items():
+        print(f"{name:28} {stats['count']:6} " + ' '.join(
+            f"{stats[key]:10.4g}" for key in ('mean', 'stdev', 'min', 'p5', 'p50', 'p95', 'max')))
+    outliers = [(name, row) for name, stats in summary['metrics'].items() for row in stats['outliers']]
+    if outliers:
+        print(f"\n{Colors.WARNING}Hôtes hors norme:{Colors.ENDC}")
+        for name, row in outliers:
+            print(f"  {row['host']:24} {name:28} {row['value']:10.4g} (limite {row['limit']:.4g})  {row['source']}")
+    if summary['invalid']:
+        print(f"\n{Colors.WARNING}Valeurs invalides ignorées:{Colors.ENDC}")
+        for host, count in sorted(summary['invalid'].items(), key=lambda item: -item[1]):
+            print(f"  {host:24} {count}")
+    return 0 if summary['reports'] else 2
+
+def run_export(args):
+    """Commande export: serveur HTTP de métriques OpenMetrics pour Prometheus"""
+    from http.server import ThreadingHTTPServer
+    exporter = Exporter(args.system_interval, args.scan_interval, args.bench_interval)
+    exporter.start()
+    server = ThreadingHTTPServer((args.host, args.port), exporter.handler())
+    server.daemon_threads = True
+    print(f"Métriques OpenMetrics sur http://{args.host}:{args.port}/metrics", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exporter.stop()
+        server.server_close()
+    return 0
+
+def run_collectors(args):
+    """Commande collectors: collecteurs déclarés et âge de leurs données en cache"""
+    import json
+    cache = get_collector_cache()
+    rows = []
+    for collector in COLLECTORS.values():
+        cached = cache.get(collector.name)
+        rows.append({
+            'name': collector.name, 'cost': collector.cost, 'refresh': collector.refresh,
+            'depends': list(collector.depends), 'age': time.time() - cached[0] if cached else None,
+        })
+    if args.format == 'json':
+        print(json.dumps(rows, indent=2))
+        return 0
+    print(f"{'collecteur':16} {'coût':10} {'validité':>9} {'âge':>9}  dépendances")
+    for row in rows:
+        age = f"{row['age']:8.0f}s" if row['age'] is not None else f"{'-':>9}"
+        print(f"{row['name']:16} {row['cost']:10} {row['refresh']:8}s {age}  {', '.join(row['depends']) or '-'}")
+    return 0
+
+def run_space(args):
+    """Commande space: ce qui occupe un système de fichiers"""
+    import json
+    cache = None
+    if args.cache is not None:
+        cache = args.cache or os.path.join(cache_dir(), 'space.db')
+
+    def progress(state):
+        if args.format == 'ndjson':
+            print(json.dumps(dict(state, check='space_progress')), flush=True)
+        elif sys.stderr.isatty():
+            print(f"\r{state['dirs']} dossiers, {state['files']} fichiers, {format_size(state['bytes'])} "
+                  f"({state['pending']} en attente)", end='', file=sys.stderr, flush=True)
+
+    summary = analyse_space(args.path, args.workers, args.top, cache, args.cache_ttl, progress)
+    if args.format == 'json':
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return 0
+    if args.format == 'ndjson':
+        print(json.dumps(dict(summary, check='space'), ensure_ascii=False))
+        return 0
+    if sys.stderr.isatty():
+        print(file=sys.stderr)
+    print(f"{Colors.BOLD}{summary['root']}: {format_size(summary['total_bytes'])} dans {summary['files']} fichiers, "
+          f"{summary['dirs']} dossiers ({summary['elapsed']:.1f}s){Colors.ENDC}")
+    if summary['cached_dirs'] or summary['skipped_mounts'] or summary['errors']:
+        print(f"{summary['cached_dirs']} dossiers repris du cache, {summary['skipped_mounts']} points de montage ignorés, "
+              f"{summary['errors']} erreurs d'accès")
+    for title, key in (("Sous-dossiers directs", 'children'), ("Dossiers les plus chargés (fichiers directs)", 'largest_dirs'),
+                       ("Plus gros fichiers", 'largest_files')):
+        print(f"\n{Colors.CYAN}{title}:{Colors.ENDC}")
+        for row in summary[key]:
+            print(f"  {format_size(row['bytes']):>10}  {row['path']}")
+    return 0
+
+def run_dashboard(args):
+    """Commande dashboard: tableau de bord en direct"""
+    run_dashboard_loop(args.hz, args.duration)
+    return 0
+
+def run_top(args):
+    """Commande top: processus les plus gourmands, ou totaux par utilisateur/cgroup"""
+    counters = list(dict.fromkeys(args.sort))
+    by = 'username' if args.by == 'user' else args.by
+    table = get_process_table()
+    if 'cpu_percent' in counters:
+        get_sampler().sample_processes()
+        time.sleep(args.interval)
+        get_sampler().sample_processes()
+    if by:
+        data = {'by': by, 'groups': table.aggregate(by, counters)[:args.n]}
+    else:
+        total, top = table.top(args.n, counters)
+        data = {'processes': total, 'top': top}
+    if args.format == 'json':
+        import json
+        print(json.dumps(data, indent=2, default=str, ensure_ascii=False))
+        return 0
+    if by:
+        print(f"{by:30} {'proc.':>6} " + ' '.join(f"{c:>14}" for c in counters))
+        for group in data['groups']:
+            print(f"{str(group['group'])[:30]:30} {group['processes']:6} " + ' '.join(f"{group[c]:14.1f}" for c in counters))
+        return 0
+    for counter, rows in top.items():
+        print(f"\nTop {args.n} processus ({counter}) sur {total}:")
+        for row in rows:
+            value = row[counter]
+            text = "N/A" if value is None else f"{value:.1f}" if isinstance(value, float) else str(value)
+            print(f"  {row['pid']:>7} {row['name'][:30]:30} {text}")
+    return 0
+
+def run_probe(args):
+    """Commande probe: latence, gigue et perte vers une liste de cibles"""
+    import asyncio
+    targets = [parse_target(t) for t in args.target] if args.target else network_targets()
+    results = asyncio.run(network_probe(targets, args.count, args.interval, args.timeout))
+    if args.format == 'json':
+        import json
+        print(json.dumps(results, indent=2))
+    else:
+        for name, stats in results.items():
+            print(f"{name:30} {format_probe(stats)}")
+    return 0 if any(stats['received'] for stats in results.values()) else 2
+
+def run_echo(args):
+    """Commande echo: serveur d'écho TCP/UDP local pour tester la commande probe"""
+    import asyncio
+
+    async def serve():
+        server, transport = await echo_server(args.host, args.port)
+        print(f"Serveur d'écho TCP/UDP sur {args.host}:{args.port}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            transport.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def parse_importtime(stderr, parent=None):
+    """Modules importés au premier niveau avec leur temps cumulé (µs), depuis la sortie de -X importtime
+
+    Avec `parent`, ce sont les modules importés directement par lui.
+    """
+    modules = []
+    children = []
+    for line in stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)', line)
+        if not match:
+            continue
+        name, cumulative, depth = match.group(4), int(match.group(2)), len(match.group(3))
+        # Un module est listé après ses propres imports: ses enfants directs le précèdent
+        if depth == 2:
+            children.append((name, cumulative))
+        elif depth == 0:
+            if parent is None:
+                modules.append((name, cumulative))
+            elif name == parent:
+                modules = children
+            children = []
+    return sorted(modules, key=lambda m: m[1], reverse=True)
+
+def run_startup(args):
+    """Commande startup: vérifie que `tool.py info` tient dans le budget imparti
+
+    Le budget porte sur le temps total du lancement moins celui de l'interpréteur seul: il inclut
+    le lanceur, l'import de outil_diag (depuis son .pyc) et de ses dépendances, et la collecte.
+    """
+    import subprocess
+
+    def best_of(cmd):
+        best = None
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            subprocess.run(cmd, capture_output=True)
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def importtime(cmd):
+        return subprocess.run([sys.executable, '-X', 'importtime'] + cmd, capture_output=True, text=True).stderr
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tool.py')
+    # Le premier lancement écrit le .pyc de outil_diag s'il manque ou n'est plus à jour
+    subprocess.run([sys.executable, script, '--help'], capture_output=True)
+    baseline = best_of([sys.executable, '-c', 'pass'])
+    total = best_of([sys.executable, script, 'info', '--json'])
+    interpreter_modules = {name for name, _ in parse_importtime(importtime(['-c', 'pass']))}
+    stderr = importtime([script, 'info', '--json'])
+    modules = [(name, t) for name, t in parse_importtime(stderr) if name not in interpreter_modules]
+    imports_ms = sum(t for _, t in modules) / 1000
+    # outil_diag est détaillé par ses propres imports
+    modules = sorted([m for m in modules if m[0] != __name__] + parse_importtime(stderr, __name__), key=lambda m: m[1], reverse=True)
+    overhead = total - baseline
+    print(f"Interpréteur seul: {baseline:.1f} ms")
+    print(f"tool.py info: {total:.1f} ms, soit {overhead:.1f} ms de plus (budget {args.budget_ms:.0f} ms)")
+    print(f"  imports: {imports_ms:.1f} ms")
+    print(f"  collecte et reste: {max(overhead - imports_ms, 0.0):.1f} ms")
+    print("Imports les plus coûteux:")
+    for name, cumulative in modules[:args.top]:
+        print(f"  {name:30} {cumulative / 1000:7.1f} ms")
+    return 0 if overhead <= args.budget_ms else 1
+
+def positive_int(text):
+    """Type argparse: entier supérieur ou égal à 1"""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"entier attendu: {text!r}")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"doit être au moins 1: {value}")
+    return value
+
+def build_parser():
+    """Construit l'analyseur de la ligne de commande"""
+    parser = argparse.ArgumentParser(prog='tool.py', description="Outil diagnostic système Windows/Linux")
+    parser.add_argument('--plugins', metavar='CHEMIN', action='append', default=[], help="fichier ou dossier de greffons collecteurs (répétable, s'ajoute à OUTIL_DIAG_PLUGINS)")
+    parser.add_argument('--profile', action='store_true', help="affiche le temps passé dans chaque sonde en fin d'exécution")
+    parser.add_argument('--profile-out', metavar='FICHIER', help="écrit aussi un profil cProfile (.prof) ou une trace Chrome (.json); implique --profile")
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('menu', help="menu interactif (par défaut)")
+    commands = {}
+    for name, func, help_text in (
+        ('info', run_info, "informations système"),
+        ('scan', run_scan, "scan des composants"),
+        ('bench', run_bench, "tests de performance"),
+    ):
+        cmd = sub.add_parser(name, help=help_text)
+        fmt = cmd.add_mutually_exclusive_group()
+        fmt.add_argument('--json', dest='format', action='store_const', const='json', help="document JSON unique")
+        fmt.add_argument('--ndjson', dest='format', action='store_const', const='ndjson', help="un objet JSON par vérification, au fil de l'eau")
+        cmd.set_defaults(format='text', func=func)
+        commands[name] = cmd
+    commands['scan'].add_argument('--only', metavar='NOMS', help="vérifications à lancer, séparées par des virgules (ex: cpu,memory)")
+    commands['scan'].add_argument('--fresh', action='store_true', help="ignore les données en cache des collecteurs")
+    commands['scan'].add_argument('--max-cost', choices=COST_CLASSES, default='expensive', help="ne lance pas les collecteurs plus coûteux: leurs dernières données en cache sont reprises")
+    commands['scan'].add_argument('--deadline', metavar='SECONDES', type=float, default=SCAN_DEADLINE, help=f"durée maximale du scan (défaut: {SCAN_DEADLINE})")
+    commands['bench'].add_argument('--deadline', metavar='SECONDES', type=float, default=BENCH_DEADLINE, help=f"durée maximale des benchmarks (défaut: {BENCH_DEADLINE})")
+    commands['bench'].add_argument('--save', metavar='FICHIER', help="sauvegarde aussi le rapport complet")
+    commands['bench'].add_argument('--no-history', action='store_true', help="ne pas archiver la mesure dans l'historique local")
+    commands['bench'].add_argument('--cpu-trials', metavar='N', type=int, default=5, help="essais mesurés par charge CPU (défaut: 5)")
+    commands['bench'].add_argument('--mem-size', metavar='MO', type=int, default=128, help="taille de travail DRAM du benchmark mémoire (défaut: 128)")
+    commands['bench'].add_argument('--mem-workers', metavar='N', type=int, help="processus copiant en parallèle, 0 pour ne mesurer qu'un processus (défaut: cœurs physiques)")
+    commands['bench'].add_argument('--disk-dir', metavar='DOSSIER', help="dossier du fichier de test disque (défaut: dossier courant)")
+    commands['bench'].add_argument('--disk-size', metavar='MO', type=int, default=64, help="taille du fichier de test disque (défaut: 64)")
+    commands['bench'].add_argument('--direct', action='store_true', help="E/S disque en O_DIRECT quand c'est possible")
+    commands['bench'].add_argument('--no-drop-cache', action='store_true', help="ne pas évincer le fichier de test du cache avant les lectures")
+    monitor = sub.add_parser('monitor', help="surveillance continue (CPU, RAM, disque, réseau)")
+    monitor.add_argument('--interval', type=float, default=1.0, help="secondes entre deux échantillons (défaut: 1)")
+    monitor.add_argument('--window', type=positive_int, default=3600, help="nombre d'échantillons conservés (défaut: 3600)")
+    monitor.add_argument('--report-every', type=positive_int, default=60, help="échantillons entre deux résumés (défaut: 60)")
+    monitor.add_argument('--duration', type=float, default=0, help="durée totale en secondes (défaut: illimitée)")
+    monitor.add_argument('--ndjson', dest='format', action='store_const', const='ndjson', help="résumés en JSON, un par ligne")
+    monitor.set_defaults(format='text', func=run_monitor)
+    top = sub.add_parser('top', help="processus les plus gourmands")
+    top.add_argument('-n', type=int, default=10, help="nombre de lignes (défaut: 10)")
+    top.add_argument('--sort', nargs='+', choices=PROCESS_COUNTERS, default=['cpu_percent', 'memory_percent'], metavar='COMPTEUR',
+                     help=f"compteurs à classer, parmi {', '.join(PROCESS_COUNTERS)} (défaut: cpu_percent memory_percent)")
+    top.add_argument('--by', choices=('user',) + PROCESS_GROUPS, help="totaux par utilisateur (user ou username) ou par cgroup")
+    top.add_argument('--interval', type=float, default=1.0, help="fenêtre de mesure de l'usage CPU en secondes (défaut: 1)")
+    top.add_argument('--json', dest='format', action='store_const', const='json', help="sortie JSON")
+    top.set_defaults(format='text', func=run_top)
+    probe = sub.add_parser('probe', help="latence, gigue et perte réseau sans ping")
+    probe.add_argument('--target', action='append', metavar='HÔTE:PORT[/udp]', help="cible à sonder (répétable; défaut: OUTIL_DIAG_TARGETS ou DNS publics)")
+    probe.add_argument('--count', type=int, default=20, help="mesures par cible (défaut: 20)")
+    probe.add_argument('--interval', type=float, default=0.05, help="secondes entre deux mesures d'une cible (défaut: 0.05)")
+    probe.add_argument('--timeout', type=float, default=1.0, help="délai avant de compter une mesure perdue (défaut: 1)")
+    probe.add_argument('--json', dest='format', action='store_const', const='json', help="sortie JSON")
+    probe.set_defaults(format='text', func=run_probe)
+    echo = sub.add_parser('echo', help="serveur d'écho TCP/UDP local pour tester probe")
+    echo.add_argument('--host', default='127.0.0.1', help="adresse d'écoute (défaut: 127.0.0.1)")
+    echo.add_argument('--port', type=int, default=7007, help="port TCP et UDP (défaut: 7007)")
+    echo.set_defaults(func=run_echo)
+    export = sub.add_parser('export', help="exportateur de métriques OpenMetrics (Prometheus)")
+    export.add_argument('--host', default='0.0.0.0', help="adresse d'écoute (défaut: 0.0.0.0)")
+    export.add_argument('--port', type=int, default=9877, help="port HTTP (défaut: 9877)")
+    export.add_argument('--system-interval', metavar='SECONDES', type=float, default=15, help="rafraîchissement des infos système (défaut: 15)")
+    export.add_argument('--scan-interval', metavar='SECONDES', type=float, default=300, help="rafraîchissement du scan et de SMART (défaut: 300)")
+    export.add_argument('--bench-interval', metavar='SECONDES', type=float, default=0, help="relance périodique des benchmarks, 0 pour n'exporter que l'historique (défaut: 0)")
+    export.set_defaults(func=run_export)
+    history = sub.add_parser('history', help="historique des benchmarks et détection de régressions")
+    history.add_argument('--db', metavar='FICHIER', help="base d'historique (défaut: OUTIL_DIAG_HISTORY ou dossier de données)")
+    history_sub = history.add_subparsers(dest='action', required=True)
+    compare = history_sub.add_parser('compare', help="compare la dernière mesure à la ligne de base")
+    compare.add_argument('--host', help="hôte à comparer (défaut: tous)")
+    compare.add_argument('--window', type=int, default=20, help="mesures précédentes formant la ligne de base (défaut: 20)")
+    compare.add_argument('--threshold', type=float, default=3.0, help="écart en MAD normalisés signalé comme régression (défaut: 3)")
+    compare.add_argument('--json', dest='format', action='store_const', const='json', help="sortie JSON")
+    compare.set_defaults(format='text')
+    show = history_sub.add_parser('show', help="affiche les mesures archivées")
+    show.add_argument('--host', help="hôte (défaut: tous)")
+    show.add_argument('--metric', help="métrique (défaut: toutes)")
+    show.add_argument('--limit', type=int, default=20, help="mesures par métrique (défaut: 20)")
+    importer = history_sub.add_parser('import', help="importe des rapports JSON (fichiers ou dossiers)")
+    importer.add_argument('paths', nargs='+', metavar='CHEMIN')
+    history.set_defaults(func=run_history)
+    aggregate = sub.add_parser('aggregate', help="analyse un parc de rapports JSON (fichiers ou dossiers)")
+    aggregate.add_argument('paths', nargs='+', metavar='CHEMIN')
+    aggregate.add_argument('--workers', type=int, help="processus de lecture (défaut: nombre de cœurs)")
+    aggregate.add_argument('--top', type=int, default=10, help="hôtes hors norme retenus par métrique (défaut: 10)")
+    aggregate.add_argument('--json', dest='format', action='store_const', const='json', help="sortie JSON")
+    aggregate.set_defaults(func=run_aggregate, format='text')
+    space = sub.add_parser('space', help="analyse de l'occupation d'un système de fichiers")
+    space.add_argument('path', nargs='?', default=os.sep, metavar='CHEMIN', help=f"dossier de départ (défaut: {os.sep})")
+    space.add_argument('--top', type=int, default=20, help="dossiers et fichiers listés (défaut: 20)")
+    space.add_argument('--workers', type=int, default=16, help="threads de lecture (défaut: 16)")
+    space.add_argument('--cache', nargs='?', const='', metavar='FICHIER', help="reprend les dossiers inchangés depuis un cache SQLite (défaut: dossier de cache)")
+    space.add_argument('--cache-ttl', metavar='SECONDES', type=float, default=86400, help="validité d'une entrée du cache (défaut: 86400)")
+    space.add_argument('--json', dest='format', action='store_const', const='json', help="sortie JSON")
+    space.add_argument('--ndjson', dest='format', action='store_const', const='ndjson', help="avancement puis résultat en JSON par ligne")
+    space.set_defaults(func=run_space, format='text')
+    dashboard = sub.add_parser('dashboard', help="tableau de bord en direct (q pour quitter)")
+    dashboard.add_argument('--hz', type=float, default=4, help="images par seconde (défaut: 4)")
+    dashboard.add_argument('--duration', metavar='SECONDES', type=float, help="durée maximale (défaut: jusqu'à q)")
+    dashboard.set_defaults(func=run_dashboard)
+    collectors = sub.add_parser('collectors', help="liste les collecteurs et l'âge de leurs données en cache")
+    collectors.add_argument('--json', dest='format', action='store_const', const='json', help="sortie JSON")
+    collectors.set_defaults(func=run_collectors, format='text')
+    startup = sub.add_parser('startup', help="mesure le temps de démarrage de la commande info")
+    startup.add_argument('--budget-ms', type=float, default=100, help="surcoût maximal toléré de `tool.py info` par rapport à l'interpréteur seul (défaut: 100)")
+    startup.add_argument('--runs', type=int, default=5, help="nombre de lancements, le meilleur est retenu (défaut: 5)")
+    startup.add_argument('--top', type=int, default=10, help="nombre d'imports détaillés (défaut: 10)")
+    startup.set_defaults(func=run_startup)
+    return parser
+
+def main(argv=None):
+    """Point d'entrée: menu interactif ou commande batch"""
+    args = build_parser().parse_args(argv)
+    plugins = [path for path in os.environ.get('OUTIL_DIAG_PLUGINS', '').split(os.pathsep) if path] + args.plugins
+    if plugins:
+        load_plugins(plugins)
+    if args.profile or args.profile_out:
+        return run_profiled(args)
+    return dispatch(args)
+
+def dispatch(args):
+    """Exécute la commande demandée, ou le menu interactif"""
+    if getattr(args, 'func', None) is None:
+        main_menu()
+        return 0
+    return args.func(args)
+
+def run_profiled(args):
+    """Exécute la commande sous le registre de sondes, et sous cProfile si un .prof est demandé"""
+    import cProfile
+    import pstats
+    out = args.profile_out or ''
+    PROFILER.enable(trace=out.endswith('.json'))
+    profiles = []
+    if out.endswith('.prof'):
+        profiles.append(cProfile.Profile())
+        if sys.version_info < (3, 12):
+            # Avant 3.12 un cProfile ne voit que son thread: un par thread lancé ensuite
+            threading.setprofile(profile_threads(profiles))
+        profiles[0].enable()
+    try:
+        return dispatch(args)
+    finally:
+        if profiles:
+            profiles[0].disable()
+            threading.setprofile(None)
+            pstats.Stats(*profiles).dump_stats(out)
+        elif out:
+            PROFILER.dump_trace(out)
+        PROFILER.report()
+
+def launch(argv=None):
+    """Point d'entrée du lanceur: main() avec les messages d'interruption et d'erreur critique"""
+    try:
+        return main(argv)
+    except KeyboardInterrupt:
+        print(f"\n{Colors.WARNING}Programme interrompu par l'utilisateur{Colors.ENDC}")
+        return 0
+    except Exception as e:
+        print(f"{Colors.FAIL}Erreur critique: {e}{Colors.ENDC}")
+        return 1
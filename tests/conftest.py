@@ -0,0 +1,69 @@
+import os
+import stat
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import outil_diag  # noqa: E402
+
+SMART_JSON = (
+    '{"device":{"type":"sat"},"rotation_rate":0,"smart_status":{"passed":true},'
+    '"ata_smart_attributes":{"table":['
+    '{"name":"Wear_Leveling_Count","value":97,"raw":{"value":12}},'
+    '{"name":"Power_On_Hours","value":99,"raw":{"value":1234}}]}}'
+)
+
+
+@pytest.fixture
+def fake_smartctl(tmp_path, monkeypatch):
+    """Installe un faux smartctl qui journalise ses appels; `delay` le fait dormir (en secondes)"""
+    if os.name == 'nt':
+        pytest.skip("faux smartctl en script shell")
+
+    def install(delay=0, output=SMART_JSON):
+        log = tmp_path / 'calls.log'
+        script = tmp_path / 'smartctl'
+        script.write_text(
+            '#!/bin/sh\n'
+            'if [ "$1" = "--version" ]; then echo "smartctl 7.3 2022-02-28"; exit 0; fi\n'
+            f'echo "$@" >> {log}\n'
+            f'sleep {delay}\n'
+            f"echo '{output}'\n"
+            # smartctl encode des avertissements dans son code retour
+            'exit 4\n'
+        )
+        script.chmod(script.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setattr(outil_diag, 'SMARTCTL', str(script))
+        return log
+
+    return install
+
+
+@pytest.fixture
+def fake_sysfs(tmp_path):
+    """Arborescence sysfs factice: deux puces hwmon, une zone thermique, secteur et batterie"""
+    files = {
+        'class/hwmon/hwmon0/name': 'nvme',
+        'class/hwmon/hwmon0/temp1_input': '38850',
+        'class/hwmon/hwmon1/name': 'coretemp',
+        'class/hwmon/hwmon1/temp1_label': 'Package id 0',
+        'class/hwmon/hwmon1/temp1_input': '52000',
+        'class/thermal/thermal_zone0/type': 'x86_pkg_temp',
+        'class/thermal/thermal_zone0/temp': '51000',
+        'class/power_supply/AC/type': 'Mains',
+        'class/power_supply/AC/online': '0',
+        'class/power_supply/BAT1/type': 'Battery',
+        'class/power_supply/BAT1/status': 'Discharging',
+        'class/power_supply/BAT1/capacity': '42',
+        'class/power_supply/BAT1/cycle_count': '0',
+        'class/power_supply/BAT1/energy_full': '40000000',
+        'class/power_supply/BAT1/energy_full_design': '50000000',
+    }
+    root = tmp_path / 'sys'
+    for name, content in files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content + '\n')
+    return root
@@ -0,0 +1,58 @@
+import asyncio
+import socket
+
+import pytest
+
+import outil_diag
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def probe_echo(port, targets, count=5):
+    async def run():
+        server, transport = await outil_diag.echo_server('127.0.0.1', port)
+        try:
+            return await outil_diag.network_probe(targets, count=count, interval=0.01, timeout=1.0)
+        finally:
+            server.close()
+            transport.close()
+            await server.wait_closed()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('proto', ['tcp', 'udp'])
+def test_probe_local_echo_server(proto):
+    port = free_port()
+    stats = probe_echo(port, [('127.0.0.1', port, proto)])[f'127.0.0.1:{port}/{proto}']
+    assert stats['sent'] == stats['received'] == 5
+    assert stats['loss_percent'] == 0
+    assert 0 <= stats['min_ms'] <= stats['avg_ms'] <= stats['p99_ms']
+    assert stats['jitter_ms'] >= 0
+
+
+def test_closed_port_counts_as_loss():
+    closed = free_port()
+    stats = asyncio.run(outil_diag.network_probe([('127.0.0.1', closed, 'tcp')], count=3, interval=0, timeout=0.5))
+    stats = stats[f'127.0.0.1:{closed}/tcp']
+    assert (stats['sent'], stats['received'], stats['loss_percent']) == (3, 0, 100.0)
+    assert stats['avg_ms'] is None
+
+
+def test_probe_stats():
+    stats = outil_diag.probe_stats([0.001, None, 0.003, 0.002])
+    assert stats['loss_percent'] == 25.0
+    assert stats['min_ms'] == pytest.approx(1.0)
+    assert stats['avg_ms'] == pytest.approx(2.0)
+    assert stats['jitter_ms'] == pytest.approx(1.5)
+
+
+def test_parse_target():
+    assert outil_diag.parse_target('example.org:443') == ('example.org', 443, 'tcp')
+    assert outil_diag.parse_target('[::1]:53/UDP') == ('::1', 53, 'udp')
+    with pytest.raises(ValueError):
+        outil_diag.parse_target('example.org')
@@ -0,0 +1,37 @@
+import asyncio
+import time
+
+import outil_diag
+
+
+def test_one_smartctl_call_per_physical_device(fake_smartctl):
+    log = fake_smartctl()
+    smart = asyncio.run(outil_diag.collect_smart(['/dev/sdb', '/dev/sda', '/dev/sda']))
+    assert sorted(smart) == ['/dev/sda', '/dev/sdb']
+    calls = log.read_text().splitlines()
+    assert sorted(calls) == ['-i -H -A -j /dev/sda', '-i -H -A -j /dev/sdb']
+    assert smart['/dev/sda']['health'] == "OK"
+    assert smart['/dev/sda']['is_ssd']
+    assert smart['/dev/sda']['life_percent'] == 97
+    assert smart['/dev/sda']['power_hours'] == '1234'
+
+
+def test_devices_are_queried_in_parallel(fake_smartctl):
+    fake_smartctl(delay=0.5)
+    start = time.monotonic()
+    smart = asyncio.run(outil_diag.collect_smart([f'/dev/sd{c}' for c in 'abcd'], max_workers=4))
+    assert time.monotonic() - start < 1.5
+    assert all(entry['health'] == "OK" for entry in smart.values())
+
+
+def test_timeout_reports_an_error(fake_smartctl):
+    fake_smartctl(delay=30)
+    start = time.monotonic()
+    smart = asyncio.run(outil_diag.collect_smart(['/dev/sda'], timeout=0.5))
+    assert time.monotonic() - start < 5
+    assert 'error' in smart['/dev/sda']
+
+
+def test_smartctl_version(fake_smartctl):
+    fake_smartctl()
+    assert asyncio.run(outil_diag.smartctl_version()) == (7, 3)
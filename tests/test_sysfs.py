@@ -0,0 +1,33 @@
+import outil_diag
+
+
+def test_temperatures(fake_sysfs):
+    with outil_diag.SysfsReader(str(fake_sysfs)) as reader:
+        assert reader.temperatures() == {
+            'nvme': [('', 38.85)],
+            'coretemp': [('Package id 0', 52.0)],
+            'thermal_zone:x86_pkg_temp': [('', 51.0)],
+        }
+        assert reader.cpu_temperature() == 52.0
+
+
+def test_battery(fake_sysfs):
+    with outil_diag.SysfsReader(str(fake_sysfs)) as reader:
+        assert reader.battery() == {'percent': 42, 'plugged': False, 'cycles': '0', 'capacity_percent': 80.0}
+
+
+def test_values_are_reread_through_open_descriptors(fake_sysfs):
+    with outil_diag.SysfsReader(str(fake_sysfs)) as reader:
+        descriptors = dict(reader._fds)
+        (fake_sysfs / 'class/hwmon/hwmon1/temp1_input').write_text('61500\n')
+        (fake_sysfs / 'class/power_supply/AC/online').write_text('1\n')
+        assert reader.cpu_temperature() == 61.5
+        assert reader.battery()['plugged']
+        assert reader._fds == descriptors
+
+
+def test_missing_tree(tmp_path):
+    with outil_diag.SysfsReader(str(tmp_path)) as reader:
+        assert reader.temperatures() == {}
+        assert reader.cpu_temperature() is None
+        assert reader.battery() is None